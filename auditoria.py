@@ -0,0 +1,195 @@
+"""
+================================================================================
+    REGISTRO DE AUDITORÍA
+    Sistema: Consultas Oftalmológicas - Clínica "Visión Clara"
+    Propósito: Dejar traza de cada modificación (agendar, cancelar, limpiar...)
+               con escritura asíncrona por lotes y consulta por RUT o fechas
+================================================================================
+"""
+
+import argparse
+import atexit
+import json
+import os
+import queue
+import sys
+import threading
+import time
+
+
+ARCHIVO_POR_DEFECTO = os.getenv('AUDITORIA_ARCHIVO', os.path.join('logs', 'auditoria.log'))
+
+
+class RegistroAuditoria:
+    """
+    Escritor de auditoría en segundo plano.
+
+    La petición solo hace un put() en una cola; un hilo agrupa los registros,
+    los serializa como JSON por línea y los escribe en lotes. El archivo rota
+    al superar `max_bytes`, conservando `respaldos` archivos anteriores.
+    Si el disco falla o la cola supera `max_pendientes`, los registros se
+    descartan y se cuentan en `descartados` en vez de acumularse en memoria.
+    """
+
+    def __init__(self, ruta=ARCHIVO_POR_DEFECTO, max_bytes=10 * 1024 * 1024, respaldos=5,
+                 tam_lote=500, intervalo=0.5, max_pendientes=100_000):
+        self.ruta = ruta
+        self.max_bytes = max_bytes
+        self.respaldos = respaldos
+        self.tam_lote = tam_lote
+        self.intervalo = intervalo
+        self.max_pendientes = max_pendientes
+        self.descartados = 0
+        self.cola = queue.SimpleQueue()
+        self._fin = object()
+        self._hilo = None
+        self._ultimo_error = None
+        self._lock = threading.Lock()
+
+    def registrar(self, accion, **datos):
+        """Encola un registro (no bloquea ni escribe en disco)"""
+        if self._hilo is None:
+            self._iniciar()
+        if self.cola.qsize() >= self.max_pendientes:
+            self.descartados += 1
+            return
+        self.cola.put((time.time(), accion, datos))
+
+    def _iniciar(self):
+        with self._lock:
+            if self._hilo is None:
+                self._hilo = threading.Thread(target=self._escribir, name='auditoria', daemon=True)
+                self._hilo.start()
+                atexit.register(self.cerrar)
+
+    def cerrar(self, timeout=5.0):
+        """Vacía la cola pendiente y detiene el hilo escritor"""
+        if self._hilo is not None and self._hilo.is_alive():
+            self.cola.put(self._fin)
+            self._hilo.join(timeout)
+
+    def _abrir(self):
+        directorio = os.path.dirname(self.ruta)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+        return open(self.ruta, 'ab')
+
+    def _escribir(self):
+        archivo = None
+        terminar = False
+        try:
+            while not terminar:
+                try:
+                    lote = [self.cola.get(timeout=self.intervalo)]
+                except queue.Empty:
+                    continue
+                while len(lote) < self.tam_lote:
+                    try:
+                        lote.append(self.cola.get_nowait())
+                    except queue.Empty:
+                        break
+                if self._fin in lote:
+                    terminar = True
+                    lote = [r for r in lote if r is not self._fin]
+                if not lote:
+                    continue
+
+                datos = ''.join(self._linea(*registro) for registro in lote).encode('utf-8')
+                try:
+                    if archivo is None:
+                        archivo = self._abrir()
+                    if archivo.tell() + len(datos) > self.max_bytes and archivo.tell() > 0:
+                        archivo.close()
+                        archivo = None
+                        self._rotar()
+                        archivo = self._abrir()
+                    archivo.write(datos)
+                    archivo.flush()
+                    self._ultimo_error = None
+                except OSError as e:
+                    # Se descarta el lote y se reintenta abrir el archivo con el siguiente
+                    self.descartados += len(lote)
+                    if archivo is not None:
+                        try:
+                            archivo.close()
+                        except OSError:
+                            pass
+                        archivo = None
+                    if str(e) != self._ultimo_error:
+                        self._ultimo_error = str(e)
+                        print(f"⚠️ Auditoría: no se pudo escribir en {self.ruta}: {e} "
+                              f"({self.descartados} registros descartados)", file=sys.stderr)
+        finally:
+            if archivo is not None:
+                archivo.close()
+
+    @staticmethod
+    def _linea(marca, accion, datos):
+        registro = {'fecha': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(marca)),
+                    'accion': accion, **datos}
+        return json.dumps(registro, ensure_ascii=False, separators=(',', ':'), default=str) + '\n'
+
+    def _rotar(self):
+        for i in range(self.respaldos - 1, 0, -1):
+            origen = f"{self.ruta}.{i}"
+            if os.path.exists(origen):
+                os.replace(origen, f"{self.ruta}.{i + 1}")
+        if self.respaldos > 0:
+            os.replace(self.ruta, f"{self.ruta}.1")
+        else:
+            os.remove(self.ruta)
+
+
+def archivos_auditoria(ruta=ARCHIVO_POR_DEFECTO):
+    """Archivo actual y rotados, del más antiguo al más reciente"""
+    rotados = []
+    i = 1
+    while os.path.exists(f"{ruta}.{i}"):
+        rotados.append(f"{ruta}.{i}")
+        i += 1
+    actuales = [ruta] if os.path.exists(ruta) else []
+    return list(reversed(rotados)) + actuales
+
+
+def buscar(ruta=ARCHIVO_POR_DEFECTO, rut=None, desde=None, hasta=None, accion=None):
+    """
+    Recorre el log filtrando por RUT, acción y rango de fechas (YYYY-MM-DD).
+    Las líneas se descartan por texto antes de decodificar el JSON.
+    """
+    marca_rut = f'"{rut}"' if rut else None
+    hasta = f"{hasta} 99" if hasta and len(hasta) == 10 else hasta
+    for nombre in archivos_auditoria(ruta):
+        with open(nombre, encoding='utf-8') as f:
+            for linea in f:
+                if marca_rut and marca_rut not in linea:
+                    continue
+                fecha = linea[10:29]  # {"fecha":"YYYY-MM-DD HH:MM:SS"
+                if (desde and fecha < desde) or (hasta and fecha > hasta):
+                    continue
+                registro = json.loads(linea)
+                if rut and registro.get('rut_paciente') != rut:
+                    continue
+                if accion and registro['accion'] != accion:
+                    continue
+                yield registro
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Consulta del registro de auditoría")
+    parser.add_argument('--archivo', default=ARCHIVO_POR_DEFECTO, help="Archivo de auditoría")
+    parser.add_argument('--rut', help="Filtrar por RUT de paciente")
+    parser.add_argument('--desde', help="Fecha inicial (YYYY-MM-DD)")
+    parser.add_argument('--hasta', help="Fecha final inclusive (YYYY-MM-DD)")
+    parser.add_argument('--accion', help="Filtrar por acción (ej. cita_cancelada, citas_limpiadas)")
+    args = parser.parse_args(argv)
+
+    total = 0
+    for registro in buscar(args.archivo, args.rut, args.desde, args.hasta, args.accion):
+        print(json.dumps(registro, ensure_ascii=False))
+        total += 1
+    print(f"📊 {total} registros", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
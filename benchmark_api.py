@@ -0,0 +1,255 @@
+"""
+================================================================================
+    BENCHMARK DE CARGA - API DE CONSULTAS
+    Sistema: Consultas Oftalmológicas - Clínica "Visión Clara"
+    Propósito: Medir throughput y latencias de la API para detectar regresiones
+================================================================================
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+
+URL_BASE = "http://localhost:5000"
+
+# Pacientes conocidos por el sistema (ver `pacientes` en sistema_consultas.py)
+RUTS_PACIENTES = ["12345678-9", "98765432-1"]
+DOCTORES_IDS = [1, 2, 3]
+TIPOS_CONSULTA = ["Control de rutina", "Examen de vista", "Examen de fondo de ojo"]
+
+# Mezcla de operaciones por defecto (peso relativo de cada endpoint)
+MEZCLA_POR_DEFECTO = {
+    "agendar": 30,
+    "citas": 20,
+    "citas_paciente": 25,
+    "paciente": 20,
+    "cancelar": 5,
+}
+
+
+def generar_horarios(dias, desde=None):
+    """Genera el calendario de bloques (fecha, hora) de 08:00 a 18:00 cada 30 minutos"""
+    inicio = desde or date.today() + timedelta(days=1)
+    horarios = []
+    for d in range(dias):
+        fecha = (inicio + timedelta(days=d)).isoformat()
+        for minuto in range(8 * 60, 18 * 60, 30):
+            horarios.append((fecha, f"{minuto // 60:02d}:{minuto % 60:02d}"))
+    return horarios
+
+
+class GeneradorCarga:
+    """Genera peticiones con distribuciones realistas de pacientes, doctores y horarios"""
+
+    def __init__(self, url_base, ruts, horarios, mezcla, semilla):
+        self.url_base = url_base.rstrip('/')
+        self.ruts = ruts
+        self.horarios = horarios
+        self.operaciones = list(mezcla)
+        self.pesos = [mezcla[op] for op in self.operaciones]
+        self.semilla = semilla
+        self.citas_creadas = []
+
+    def _rut(self, rnd):
+        # Distribución sesgada: pocos pacientes concentran la mayoría de consultas
+        indice = min(int(rnd.paretovariate(1.2)) - 1, len(self.ruts) - 1)
+        return self.ruts[indice]
+
+    def peticion(self, rnd):
+        """Devuelve (nombre_endpoint, metodo, ruta, cuerpo) para la siguiente petición"""
+        operacion = rnd.choices(self.operaciones, self.pesos)[0]
+
+        if operacion == "agendar":
+            fecha, hora = rnd.choice(self.horarios)
+            cuerpo = {
+                'rut_paciente': self._rut(rnd),
+                'doctor_id': rnd.choice(DOCTORES_IDS),
+                'fecha': fecha,
+                'hora': hora,
+                'tipo_consulta': rnd.choice(TIPOS_CONSULTA),
+            }
+            return "/api/agendar", "POST", "/api/agendar", cuerpo
+        if operacion == "citas":
+            return "/api/citas", "GET", "/api/citas", None
+        if operacion == "citas_paciente":
+            return "/api/citas/<rut>", "GET", f"/api/citas/{self._rut(rnd)}", None
+        if operacion == "paciente":
+            return "/api/paciente/<rut>", "GET", f"/api/paciente/{self._rut(rnd)}", None
+
+        # Cancelar: preferir citas creadas por este benchmark, si existen
+        cita_id = rnd.choice(self.citas_creadas) if self.citas_creadas else rnd.randint(1, 1000)
+        return "/api/cancelar/<id>", "POST", f"/api/cancelar/{cita_id}", None
+
+    def ejecutar(self, metodo, ruta, cuerpo, timeout):
+        """Ejecuta una petición HTTP y devuelve (status, latencia_segundos)"""
+        datos = json.dumps(cuerpo).encode('utf-8') if cuerpo is not None else b""
+        req = urllib.request.Request(self.url_base + ruta, data=datos if metodo == "POST" else None,
+                                     method=metodo)
+        if cuerpo is not None:
+            req.add_header('Content-Type', 'application/json')
+
+        inicio = time.perf_counter()
+        try:
+            with urllib.request.urlopen(req, timeout=timeout) as respuesta:
+                contenido = respuesta.read()
+                status = respuesta.status
+        except urllib.error.HTTPError as e:
+            e.read()
+            status = e.code
+            contenido = b""
+        except (urllib.error.URLError, OSError):
+            return 0, time.perf_counter() - inicio
+        latencia = time.perf_counter() - inicio
+
+        if ruta == "/api/agendar" and status == 200:
+            try:
+                self.citas_creadas.append(json.loads(contenido)['cita']['id'])
+            except (ValueError, KeyError):
+                pass
+        return status, latencia
+
+
+def percentil(valores_ordenados, p):
+    """Percentil por interpolación lineal sobre una lista ya ordenada"""
+    if not valores_ordenados:
+        return 0.0
+    k = (len(valores_ordenados) - 1) * p / 100
+    f = int(k)
+    c = min(f + 1, len(valores_ordenados) - 1)
+    return valores_ordenados[f] + (valores_ordenados[c] - valores_ordenados[f]) * (k - f)
+
+
+def resumir(latencias, estados, duracion):
+    """Construye el resumen de throughput, latencias (ms) y códigos de estado"""
+    ordenadas = sorted(latencias)
+    return {
+        'peticiones': len(ordenadas),
+        'errores': sum(n for s, n in estados.items() if s == 0 or s >= 500),
+        'throughput_rps': round(len(ordenadas) / duracion, 2) if duracion > 0 else 0.0,
+        'latencia_ms': {
+            'media': round(statistics.fmean(ordenadas) * 1000, 3) if ordenadas else 0.0,
+            'p50': round(percentil(ordenadas, 50) * 1000, 3),
+            'p90': round(percentil(ordenadas, 90) * 1000, 3),
+            'p95': round(percentil(ordenadas, 95) * 1000, 3),
+            'p99': round(percentil(ordenadas, 99) * 1000, 3),
+            'max': round(ordenadas[-1] * 1000, 3) if ordenadas else 0.0,
+        },
+        'codigos_estado': {str(s): n for s, n in sorted(estados.items())},
+    }
+
+
+def ejecutar_benchmark(url_base=URL_BASE, peticiones=1000, concurrencia=8, dias=30,
+                       ruts=None, mezcla=None, semilla=42, timeout=10.0, calentamiento=20):
+    """Ejecuta el benchmark y devuelve el reporte como diccionario"""
+    generador = GeneradorCarga(url_base, ruts or RUTS_PACIENTES, generar_horarios(dias),
+                               mezcla or MEZCLA_POR_DEFECTO, semilla)
+
+    # Calentamiento (no se contabiliza)
+    rnd_calentamiento = random.Random(semilla - 1)
+    for _ in range(calentamiento):
+        _, metodo, ruta, cuerpo = generador.peticion(rnd_calentamiento)
+        if metodo == "GET":
+            generador.ejecutar(metodo, ruta, cuerpo, timeout)
+
+    # Cada worker usa su propio generador aleatorio para que la carga sea reproducible
+    por_worker = [peticiones // concurrencia + (1 if i < peticiones % concurrencia else 0)
+                  for i in range(concurrencia)]
+
+    def worker(indice):
+        rnd = random.Random(semilla * 1000 + indice)
+        resultados = []
+        for _ in range(por_worker[indice]):
+            endpoint, metodo, ruta, cuerpo = generador.peticion(rnd)
+            status, latencia = generador.ejecutar(metodo, ruta, cuerpo, timeout)
+            resultados.append((endpoint, status, latencia))
+        return resultados
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrencia) as executor:
+        lotes = list(executor.map(worker, range(concurrencia)))
+    duracion = time.perf_counter() - inicio
+
+    por_endpoint = {}
+    latencias_totales = []
+    estados_totales = {}
+    for lote in lotes:
+        for endpoint, status, latencia in lote:
+            datos = por_endpoint.setdefault(endpoint, ([], {}))
+            datos[0].append(latencia)
+            datos[1][status] = datos[1].get(status, 0) + 1
+            latencias_totales.append(latencia)
+            estados_totales[status] = estados_totales.get(status, 0) + 1
+
+    return {
+        'configuracion': {
+            'url_base': url_base,
+            'peticiones': peticiones,
+            'concurrencia': concurrencia,
+            'dias_calendario': dias,
+            'pacientes': len(generador.ruts),
+            'semilla': semilla,
+        },
+        'duracion_s': round(duracion, 3),
+        'total': resumir(latencias_totales, estados_totales, duracion),
+        'endpoints': {ep: resumir(lat, est, duracion)
+                      for ep, (lat, est) in sorted(por_endpoint.items())},
+    }
+
+
+def cargar_ruts(ruta):
+    """Lee una lista de RUTs (uno por línea) desde un archivo"""
+    with open(ruta, encoding='utf-8') as f:
+        return [linea.strip() for linea in f if linea.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de carga de la API de consultas")
+    parser.add_argument('--url', default=URL_BASE, help="URL base del servidor")
+    parser.add_argument('-n', '--peticiones', type=int, default=1000, help="Total de peticiones")
+    parser.add_argument('-c', '--concurrencia', type=int, default=8, help="Clientes concurrentes")
+    parser.add_argument('--dias', type=int, default=30, help="Días de calendario a usar")
+    parser.add_argument('--ruts', help="Archivo con RUTs de pacientes (uno por línea)")
+    parser.add_argument('--semilla', type=int, default=42, help="Semilla aleatoria")
+    parser.add_argument('--timeout', type=float, default=10.0, help="Timeout por petición (s)")
+    parser.add_argument('--limpiar', action='store_true',
+                        help="Llamar a /api/limpiar antes de comenzar")
+    parser.add_argument('-o', '--salida', help="Archivo JSON de salida (por defecto stdout)")
+    args = parser.parse_args(argv)
+
+    if args.limpiar:
+        req = urllib.request.Request(args.url.rstrip('/') + "/api/limpiar", data=b"", method="POST")
+        urllib.request.urlopen(req, timeout=args.timeout).read()
+
+    reporte = ejecutar_benchmark(
+        url_base=args.url,
+        peticiones=args.peticiones,
+        concurrencia=args.concurrencia,
+        dias=args.dias,
+        ruts=cargar_ruts(args.ruts) if args.ruts else None,
+        semilla=args.semilla,
+        timeout=args.timeout,
+    )
+
+    salida = json.dumps(reporte, indent=2, ensure_ascii=False)
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            f.write(salida + "\n")
+        total = reporte['total']
+        print(f"📊 {total['peticiones']} peticiones | {total['throughput_rps']} req/s | "
+              f"p95 {total['latencia_ms']['p95']} ms | errores {total['errores']}")
+    else:
+        print(salida)
+
+    return 1 if reporte['total']['errores'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""
+================================================================================
+    BENCHMARK DEL BUS DE EVENTOS (SSE)
+    Sistema: Consultas Oftalmológicas - Clínica "Visión Clara"
+    Propósito: Verificar que el costo por cliente conectado se mantiene constante
+               al aumentar la cantidad de interfaces abiertas
+================================================================================
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from eventos import BusEventos
+
+
+CITA_EJEMPLO = {
+    'id': 1,
+    'rut_paciente': '12345678-9',
+    'nombre_paciente': 'Juan Pérez',
+    'doctor_id': 1,
+    'nombre_doctor': 'Dra. María González',
+    'fecha': '2030-01-01',
+    'hora': '10:00',
+    'tipo_consulta': 'Control de rutina',
+    'estado': 'Agendada',
+    'fecha_creacion': '2026-01-01 10:00:00',
+}
+
+
+def medir(clientes, eventos):
+    """
+    Mide por separado el costo de publicar (lo que paga la petición que agenda o
+    cancela) y el de despachar (lo que paga el hilo de cada conexión SSE).
+    """
+    bus = BusEventos(capacidad_cliente=eventos + 1)
+    suscripciones = [bus.suscribir() for _ in range(clientes)]
+    recibidos = [0] * clientes
+
+    inicio = time.perf_counter()
+    for i in range(eventos):
+        bus.publicar('cita_agendada', dict(CITA_EJEMPLO, id=i + 1))
+    publicacion = time.perf_counter() - inicio
+
+    def consumir(indice, suscripcion):
+        flujo = bus.transmitir(suscripcion, intervalo_ping=0.5)
+        next(flujo)  # retry inicial
+        for mensaje in flujo:
+            if mensaje.startswith('id:'):
+                recibidos[indice] += 1
+                if recibidos[indice] == eventos:
+                    flujo.close()
+                    return
+
+    inicio = time.perf_counter()
+    for indice, suscripcion in enumerate(suscripciones):
+        consumir(indice, suscripcion)
+    despacho = time.perf_counter() - inicio
+
+    entregas = clientes * eventos
+    return {
+        'clientes': clientes,
+        'eventos': eventos,
+        'entregados': sum(recibidos),
+        'publicacion_ms': round(publicacion * 1000, 3),
+        'us_publicacion_por_cliente': round(publicacion / entregas * 1e6, 3),
+        'us_despacho_por_entrega': round(despacho / entregas * 1e6, 3),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark del bus de eventos SSE")
+    parser.add_argument('--clientes', default="1,10,100,1000",
+                        help="Cantidades de clientes a probar, separadas por coma")
+    parser.add_argument('-e', '--eventos', type=int, default=200, help="Eventos por medición")
+    parser.add_argument('--tolerancia', type=float, default=3.0,
+                        help="Máximo crecimiento aceptado del costo por entrega")
+    args = parser.parse_args(argv)
+
+    resultados = [medir(int(n), args.eventos) for n in args.clientes.split(',')]
+    # La primera medición incluye la serialización (una vez por evento): se compara
+    # el costo marginal por cliente desde la segunda en adelante
+    comparables = resultados[1:] or resultados
+    costos = [r['us_publicacion_por_cliente'] + r['us_despacho_por_entrega'] for r in comparables]
+    crecimiento = max(costos) / (min(costos) or 1e-9)
+    completos = all(r['entregados'] == r['clientes'] * r['eventos'] for r in resultados)
+    constante = crecimiento <= args.tolerancia
+
+    print(json.dumps({
+        'resultados': resultados,
+        'crecimiento_costo_por_cliente': round(crecimiento, 2),
+        'entregas_completas': completos,
+        'costo_constante': constante,
+    }, indent=2, ensure_ascii=False))
+    return 0 if completos and constante else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""
+================================================================================
+    MICRO-BENCHMARK DE VALIDACIÓN DE FECHA Y HORA
+    Sistema: Consultas Oftalmológicas - Clínica "Visión Clara"
+    Propósito: Comparar el costo por petición de strptime/now/strftime con la
+               representación normalizada (día, minuto) y su caché
+================================================================================
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from datetime import datetime
+
+from horarios import fecha_iso, hora_texto, parsear_fecha, parsear_hora, reloj
+
+
+def validar_anterior(fecha, hora):
+    """Camino original de agendar_cita: strptime + datetime.now() + strftime"""
+    fecha_cita = datetime.strptime(fecha, '%Y-%m-%d')
+    if fecha_cita.date() < datetime.now().date():
+        raise ValueError('pasada')
+    return fecha, hora, datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+
+def validar_normalizado(fecha, hora):
+    """Camino actual: parseo cacheado a (día, minuto) y reloj cacheado por segundo"""
+    dia = parsear_fecha(fecha)
+    if dia < reloj.hoy():
+        raise ValueError('pasada')
+    minuto = parsear_hora(hora)
+    return fecha_iso(dia), hora_texto(minuto), reloj.marca()
+
+
+def medir(funcion, entradas):
+    inicio = time.perf_counter()
+    for fecha, hora in entradas:
+        funcion(fecha, hora)
+    return (time.perf_counter() - inicio) / len(entradas) * 1e9
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Micro-benchmark de validación de fecha/hora")
+    parser.add_argument('-n', '--peticiones', type=int, default=200_000, help="Validaciones por medición")
+    parser.add_argument('--dias', type=int, default=365, help="Días distintos en la muestra")
+    parser.add_argument('--semilla', type=int, default=42, help="Semilla aleatoria")
+    args = parser.parse_args(argv)
+
+    rnd = random.Random(args.semilla)
+    hoy = reloj.hoy()
+    fechas = [fecha_iso(hoy + 1 + d) for d in range(args.dias)]
+    horas = [f"{m // 60:02d}:{m % 60:02d}" for m in range(8 * 60, 18 * 60, 30)]
+    entradas = [(rnd.choice(fechas), rnd.choice(horas)) for _ in range(args.peticiones)]
+
+    anterior = medir(validar_anterior, entradas)
+    normalizado = medir(validar_normalizado, entradas)
+    print(json.dumps({
+        'peticiones': args.peticiones,
+        'ns_por_validacion': {
+            'strptime_now_strftime': round(anterior, 1),
+            'normalizado_con_cache': round(normalizado, 1),
+        },
+        'aceleracion': round(anterior / normalizado, 1),
+    }, indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""
+================================================================================
+    BENCHMARK DEL LIMITADOR DE TASA
+    Sistema: Consultas Oftalmológicas - Clínica "Visión Clara"
+    Propósito: Medir el costo por petición del token bucket y del control de
+               admisión que protegen /api/agendar y /api/limpiar
+================================================================================
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+
+from limitador import ControlAdmision, LimitadorTasa
+
+
+def medir_limitador(claves, operaciones, semilla=42):
+    """ns por llamada a permitir() con `claves` clientes distintos"""
+    limitador = LimitadorTasa(capacidad=30, recarga_por_segundo=10, max_claves=max(claves, 1))
+    rnd = random.Random(semilla)
+    secuencia = [f"10.0.{i // 256 % 256}.{i % 256}-{i}" for i in
+                 (rnd.randrange(claves) for _ in range(operaciones))]
+
+    inicio = time.perf_counter()
+    for clave in secuencia:
+        limitador.permitir(clave)
+    duracion = time.perf_counter() - inicio
+    return {
+        'claves': claves,
+        'operaciones': operaciones,
+        'ns_por_peticion': round(duracion / operaciones * 1e9, 1),
+        'cubos_en_memoria': len(limitador),
+    }
+
+
+def medir_admision(operaciones):
+    """ns por par entrar()/salir() sin contención"""
+    admision = ControlAdmision(max_concurrentes=8, max_en_cola=32)
+    inicio = time.perf_counter()
+    for _ in range(operaciones):
+        admision.entrar()
+        admision.salir()
+    return round((time.perf_counter() - inicio) / operaciones * 1e9, 1)
+
+
+def medir_endpoint(peticiones):
+    """µs por POST a /api/agendar con y sin limitador (cliente de pruebas de Flask)"""
+    import sistema_consultas
+
+    cliente = sistema_consultas.app.test_client()
+    # IP y RUT distintos en cada petición: ningún cubo se agota y ambas pasadas
+    # recorren el mismo camino (paciente inexistente -> 400 en la validación)
+    cuerpos = [{'rut_paciente': f"{10_000_000 + i}-0", 'doctor_id': 1, 'fecha': '2030-01-01',
+                'hora': '10:00', 'tipo_consulta': 'Control de rutina'} for i in range(peticiones)]
+    ips = [f"10.1.{i // 256 % 256}.{i % 256}" for i in range(peticiones)]
+
+    sistema_consultas.app.config['LIMITE_TASA_ACTIVO'] = False
+    for cuerpo in cuerpos[:200]:  # calentamiento
+        cliente.post('/api/agendar', json=cuerpo)
+
+    resultados = {}
+    estados = {}
+    for activo in (False, True):
+        sistema_consultas.app.config['LIMITE_TASA_ACTIVO'] = activo
+        codigos = []
+        inicio = time.perf_counter()
+        for cuerpo, ip in zip(cuerpos, ips):
+            codigos.append(cliente.post('/api/agendar', json=cuerpo,
+                                        environ_overrides={'REMOTE_ADDR': ip}).status_code)
+        resultados['con_limitador' if activo else 'sin_limitador'] = round(
+            (time.perf_counter() - inicio) / peticiones * 1e6, 2)
+        estados[activo] = codigos
+    # Si el limitador rechazara peticiones se compararía el 429 rápido con la validación completa
+    assert estados[True] == estados[False], \
+        f"Los códigos de estado difieren entre pasadas: {sorted(set(estados[True]))} vs {sorted(set(estados[False]))}"
+    resultados['codigos'] = sorted(set(estados[True]))
+    resultados['sobrecosto_us'] = round(resultados['con_limitador'] - resultados['sin_limitador'], 2)
+    return resultados
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark del limitador de tasa")
+    parser.add_argument('-n', '--operaciones', type=int, default=200_000,
+                        help="Llamadas por medición del limitador")
+    parser.add_argument('--peticiones', type=int, default=2000,
+                        help="Peticiones HTTP simuladas por medición del endpoint")
+    args = parser.parse_args(argv)
+
+    reporte = {
+        'limitador': [medir_limitador(claves, args.operaciones) for claves in (1, 1000, 100_000)],
+        'admision_ns_por_peticion': medir_admision(args.operaciones),
+        'endpoint_us_por_peticion': medir_endpoint(args.peticiones),
+    }
+    print(json.dumps(reporte, indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
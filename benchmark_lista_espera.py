@@ -0,0 +1,89 @@
+"""
+================================================================================
+    BENCHMARK DE LA LISTA DE ESPERA
+    Sistema: Consultas Oftalmológicas - Clínica "Visión Clara"
+    Propósito: Medir el costo de cancelar una cita con reasignación automática
+               a medida que crece la lista de espera
+================================================================================
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault('LIMITE_TASA', '0')
+os.environ.setdefault('SEMBRADO', '1')
+
+import sistema_consultas as sc
+
+
+def sembrar_base(cliente, semilla):
+    """Pacientes y doctores una sola vez: /api/limpiar no los borra"""
+    cliente.post('/api/sembrar', json={'pacientes': 20_000, 'doctores': 20, 'citas': 0,
+                                       'semilla': semilla})
+
+
+def preparar(cliente, solicitudes, semilla):
+    """
+    Mismas citas sembradas para cada tamaño más `solicitudes` pacientes en espera
+    (carga directa, sin HTTP).
+    """
+    cliente.post('/api/limpiar')
+    cliente.post('/api/sembrar', json={'pacientes': 0, 'doctores': 0, 'citas': 50_000,
+                                       'semilla': semilla})
+
+    rnd = random.Random(semilla)
+    ruts = list(sc.pacientes)
+    doctores_ids = [d['id'] for d in sc.doctores]
+    primer_dia = sc.parsear_fecha(sc.citas[0]['fecha'])
+    ultimo_dia = sc.parsear_fecha(sc.citas[-1]['fecha'])
+    for _ in range(solicitudes):
+        desde = rnd.randint(primer_dia, ultimo_dia)
+        sc.lista_espera.registrar(rnd.choice(ruts), rnd.choice(doctores_ids), desde,
+                                  min(desde + rnd.randint(0, 6), ultimo_dia),
+                                  rnd.randint(0, 3), tipo_consulta='Control de rutina',
+                                  fecha_creacion=sc.reloj.marca())
+
+
+def medir(cliente, solicitudes, cancelaciones, semilla):
+    preparar(cliente, solicitudes, semilla)
+    rnd = random.Random(semilla + 1)
+    ids = rnd.sample(range(1, len(sc.citas) + 1), cancelaciones)
+
+    reasignadas = 0
+    inicio = time.perf_counter()
+    for cita_id in ids:
+        if 'reasignada' in cliente.post(f'/api/cancelar/{cita_id}').get_json():
+            reasignadas += 1
+    duracion = time.perf_counter() - inicio
+
+    return {
+        'solicitudes_en_espera': solicitudes,
+        'doctores': len(sc.doctores),
+        'cancelaciones': cancelaciones,
+        'reasignadas': reasignadas,
+        'us_por_cancelacion': round(duracion / cancelaciones * 1e6, 1),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de la lista de espera")
+    parser.add_argument('--tamanos', default="0,1000,10000,100000",
+                        help="Tamaños de lista de espera a probar, separados por coma")
+    parser.add_argument('-n', '--cancelaciones', type=int, default=2000,
+                        help="Cancelaciones por medición")
+    parser.add_argument('--semilla', type=int, default=42, help="Semilla aleatoria")
+    args = parser.parse_args(argv)
+
+    cliente = sc.app.test_client()
+    sembrar_base(cliente, args.semilla)
+    resultados = [medir(cliente, int(n), args.cancelaciones, args.semilla) for n in args.tamanos.split(',')]
+    print(json.dumps({'resultados': resultados}, indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+"""
+================================================================================
+    BENCHMARK DEL PERFILADOR
+    Sistema: Consultas Oftalmológicas - Clínica "Visión Clara"
+    Propósito: Medir el costo por petición del perfilado desactivado, activo
+               sin muestreo y con cProfile en todas las peticiones
+================================================================================
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+os.environ.setdefault('LIMITE_TASA', '0')
+
+import sistema_consultas as sc
+
+
+def medir(cliente, peticiones, ruta):
+    inicio = time.perf_counter()
+    for _ in range(peticiones):
+        cliente.get(ruta)
+    return (time.perf_counter() - inicio) / peticiones * 1e6
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark del perfilador de peticiones")
+    parser.add_argument('-n', '--peticiones', type=int, default=20_000, help="Peticiones por medición")
+    parser.add_argument('--ruta', default='/api/estado', help="Endpoint a consultar")
+    args = parser.parse_args(argv)
+
+    cliente = sc.app.test_client()
+    sc.perfilador.umbral = float('inf')  # medir el costo, no guardar perfiles
+    medir(cliente, 1000, args.ruta)  # calentamiento
+
+    resultados = {}
+    for nombre, activo, tasa in [('desactivado', False, 0.0),
+                                 ('activo_sin_muestreo', True, 0.0),
+                                 ('cprofile_todas', True, 1.0)]:
+        sc.app.config['PERFILADO_ACTIVO'] = activo
+        sc.perfilador.tasa_muestreo = tasa
+        resultados[nombre] = round(medir(cliente, args.peticiones, args.ruta), 1)
+
+    print(json.dumps({
+        'ruta': args.ruta,
+        'peticiones': args.peticiones,
+        'us_por_peticion': resultados,
+    }, indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+"""
+================================================================================
+    BUS DE EVENTOS (SERVER-SENT EVENTS)
+    Sistema: Consultas Oftalmológicas - Clínica "Visión Clara"
+    Propósito: Notificar a las interfaces abiertas los cambios en las citas
+               sin que tengan que volver a descargar las listas completas
+================================================================================
+"""
+
+from collections import deque
+import json
+import threading
+
+
+class Suscripcion:
+    """Cola acotada de mensajes pendientes para un cliente conectado"""
+
+    def __init__(self, capacidad):
+        self.pendientes = deque()
+        self.capacidad = capacidad
+        self.desbordada = False
+        self.condicion = threading.Condition()
+
+    def entregar(self, mensaje):
+        with self.condicion:
+            if len(self.pendientes) >= self.capacidad:
+                # Cliente demasiado lento: se le pedirá resincronizar
+                self.desbordada = True
+            else:
+                self.pendientes.append(mensaje)
+            self.condicion.notify()
+
+    def siguiente(self, timeout):
+        """Devuelve el siguiente mensaje, o None si se agotó el tiempo de espera"""
+        with self.condicion:
+            if not self.pendientes and not self.desbordada:
+                self.condicion.wait(timeout)
+            if self.pendientes:
+                return self.pendientes.popleft()
+            return None
+
+
+class BusEventos:
+    """
+    Publica eventos a todos los suscriptores.
+
+    Cada evento se serializa una sola vez y el mismo texto se entrega a cada
+    cliente, así el costo por cliente es solo agregarlo a su cola.
+    """
+
+    def __init__(self, capacidad_cliente=500, historial=256):
+        self.capacidad_cliente = capacidad_cliente
+        self.suscripciones = set()
+        self.recientes = deque(maxlen=historial)
+        self.secuencia = 0
+        self.lock = threading.Lock()
+
+    def publicar(self, tipo, datos):
+        with self.lock:
+            self.secuencia += 1
+            mensaje = (f"id: {self.secuencia}\nevent: {tipo}\n"
+                       f"data: {json.dumps(datos, ensure_ascii=False, separators=(',', ':'))}\n\n")
+            self.recientes.append((self.secuencia, mensaje))
+            destinatarios = list(self.suscripciones)
+        for suscripcion in destinatarios:
+            suscripcion.entregar(mensaje)
+        return self.secuencia
+
+    def suscribir(self, ultimo_id=None):
+        """Registra un cliente; si trae Last-Event-ID se le reenvían los eventos perdidos"""
+        suscripcion = Suscripcion(self.capacidad_cliente)
+        with self.lock:
+            if ultimo_id is not None:
+                for secuencia, mensaje in self.recientes:
+                    if secuencia > ultimo_id:
+                        suscripcion.pendientes.append(mensaje)
+            self.suscripciones.add(suscripcion)
+        return suscripcion
+
+    def desuscribir(self, suscripcion):
+        with self.lock:
+            self.suscripciones.discard(suscripcion)
+
+    def clientes(self):
+        with self.lock:
+            return len(self.suscripciones)
+
+    def transmitir(self, suscripcion, intervalo_ping=15.0):
+        """Generador con el flujo text/event-stream de un cliente"""
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                mensaje = suscripcion.siguiente(intervalo_ping)
+                if mensaje is not None:
+                    yield mensaje
+                elif suscripcion.desbordada:
+                    # Se descartaron eventos: el cliente debe recargar su vista y reconectarse
+                    yield "event: resincronizar\ndata: {}\n\n"
+                    return
+                else:
+                    yield ": ping\n\n"
+        finally:
+            self.desuscribir(suscripcion)
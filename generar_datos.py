@@ -0,0 +1,266 @@
+"""
+================================================================================
+    GENERADOR DE DATOS SINTÉTICOS
+    Sistema: Consultas Oftalmológicas - Clínica "Visión Clara"
+    Propósito: Poblar el sistema con pacientes, doctores y citas a gran escala
+================================================================================
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+import urllib.request
+from datetime import date, timedelta
+
+
+NOMBRES = ["Juan", "Ana", "María", "Carlos", "Patricia", "José", "Camila", "Luis",
+           "Valentina", "Diego", "Francisca", "Matías", "Javiera", "Pedro", "Catalina",
+           "Sebastián", "Fernanda", "Felipe", "Constanza", "Andrés"]
+APELLIDOS = ["Pérez", "Silva", "González", "Soto", "Rojas", "Muñoz", "Díaz", "Contreras",
+             "Martínez", "Sepúlveda", "Morales", "Rodríguez", "López", "Fuentes", "Hernández",
+             "Torres", "Araya", "Flores", "Espinoza", "Valenzuela"]
+ESPECIALIDADES = ["Oftalmología General", "Cirugía Refractiva", "Retina y Vítreo",
+                  "Glaucoma", "Córnea", "Oftalmología Pediátrica"]
+TIPOS_CONSULTA = ["Control de rutina", "Examen de vista", "Examen de fondo de ojo"]
+DIAGNOSTICOS = ["Visión normal", "Miopía leve (-1.5)", "Hipermetropía leve", "Astigmatismo",
+                "Presbicia", "Normal", "Ojo seco"]
+
+# Bloques de atención: 08:00 a 18:00 cada 30 minutos
+HORAS = [f"{m // 60:02d}:{m % 60:02d}" for m in range(8 * 60, 18 * 60, 30)]
+
+
+def digito_verificador(numero):
+    """Calcula el dígito verificador de un RUT chileno (módulo 11)"""
+    suma = 0
+    factor = 2
+    while numero:
+        suma += (numero % 10) * factor
+        numero //= 10
+        factor = factor + 1 if factor < 7 else 2
+    resto = 11 - suma % 11
+    if resto == 11:
+        return "0"
+    if resto == 10:
+        return "K"
+    return str(resto)
+
+
+def rut_valido(rut):
+    """Verifica formato y dígito verificador de un RUT ('12345678-5')"""
+    try:
+        cuerpo, dv = rut.split('-')
+        return digito_verificador(int(cuerpo)) == dv.upper()
+    except ValueError:
+        return False
+
+
+def generar_pacientes(n, rnd, excluir=()):
+    """Genera n pacientes con RUT válido e historial médico"""
+    pacientes = {}
+    usados = set(excluir)
+    hoy = date.today()
+    while len(pacientes) < n:
+        numero = rnd.randint(5_000_000, 25_999_999)
+        rut = f"{numero}-{digito_verificador(numero)}"
+        if rut in usados:
+            continue
+        usados.add(rut)
+
+        nombre = f"{rnd.choice(NOMBRES)} {rnd.choice(APELLIDOS)}"
+        historial = [
+            {
+                "fecha": (hoy - timedelta(days=rnd.randint(30, 1500))).isoformat(),
+                "tipo": rnd.choice(TIPOS_CONSULTA),
+                "diagnostico": rnd.choice(DIAGNOSTICOS),
+                "doctor": f"Dr. {rnd.choice(NOMBRES)} {rnd.choice(APELLIDOS)}",
+            }
+            for _ in range(rnd.randint(0, 3))
+        ]
+        historial.sort(key=lambda h: h['fecha'], reverse=True)
+
+        pacientes[rut] = {
+            "rut": rut,
+            "nombre": nombre,
+            "email": f"{nombre.lower().replace(' ', '.')}{numero % 1000}@email.com",
+            "telefono": f"+569{rnd.randint(10_000_000, 99_999_999)}",
+            "historial": historial,
+        }
+    return pacientes
+
+
+def generar_doctores(m, rnd, id_inicial=1):
+    """Genera m doctores con ids correlativos a partir de id_inicial"""
+    return [
+        {
+            "id": id_inicial + i,
+            "nombre": f"{rnd.choice(['Dr.', 'Dra.'])} {rnd.choice(NOMBRES)} {rnd.choice(APELLIDOS)}",
+            "especialidad": rnd.choice(ESPECIALIDADES),
+        }
+        for i in range(m)
+    ]
+
+
+def generar_citas(k, pacientes, doctores, rnd, id_inicial=1, desde=None,
+                  ocupados_doctor=None, ocupados_paciente=None):
+    """
+    Genera k citas futuras sin conflictos de doctor ni de paciente.
+
+    Cada cita ocupa un bloque (doctor, día, hora) distinto, elegido por muestreo
+    sin reemplazo sobre los bloques libres del calendario necesario para k citas.
+    `ocupados_doctor` / `ocupados_paciente` contienen los horarios ya tomados
+    como (doctor_id, día ordinal, minuto) y (rut, día ordinal, minuto), con el
+    formato de los índices del servidor; esos bloques se omiten.
+    """
+    if k == 0:
+        return []
+    if not pacientes or not doctores:
+        raise ValueError("Se requieren pacientes y doctores para generar citas")
+
+    inicio = desde or date.today() + timedelta(days=1)
+    primer_dia = inicio.toordinal()
+    minutos = [int(h[:2]) * 60 + int(h[3:]) for h in HORAS]
+    bloques_por_dia = len(HORAS) * len(doctores)
+    # 25% de holgura para que el calendario no quede completamente lleno
+    necesarios = -(-k * 5 // 4)
+    if ocupados_doctor:
+        # Se agregan días hasta juntar suficientes bloques libres
+        libres = []
+        dias = 0
+        while len(libres) < necesarios:
+            base = dias * bloques_por_dia
+            for pos_doctor, doctor in enumerate(doctores):
+                for pos_hora, minuto in enumerate(minutos):
+                    if (doctor['id'], primer_dia + dias, minuto) not in ocupados_doctor:
+                        libres.append(base + pos_doctor * len(HORAS) + pos_hora)
+            dias += 1
+    else:
+        dias = max(1, -(-necesarios // bloques_por_dia))
+        libres = range(dias * bloques_por_dia)
+    fechas = [(inicio + timedelta(days=d)).isoformat() for d in range(dias)]
+    ocupados_paciente = ocupados_paciente or ()
+
+    ruts = list(pacientes)
+    nombres_pacientes = {rut: p['nombre'] for rut, p in pacientes.items()}
+    creacion = time.strftime('%Y-%m-%d %H:%M:%S')
+    nuevos_paciente = set()
+    citas = []
+
+    for indice, bloque in enumerate(rnd.sample(libres, k)):
+        dia, resto = divmod(bloque, bloques_por_dia)
+        pos_doctor, pos_hora = divmod(resto, len(HORAS))
+        doctor = doctores[pos_doctor]
+        fecha = fechas[dia]
+        hora = HORAS[pos_hora]
+
+        # Evitar que un paciente tenga dos citas en el mismo horario
+        clave_horario = (primer_dia + dia, minutos[pos_hora])
+        rut = ruts[rnd.randrange(len(ruts))]
+        intentos = 0
+        while ((rut, *clave_horario) in nuevos_paciente or (rut, *clave_horario) in ocupados_paciente) \
+                and intentos < 10:
+            rut = ruts[rnd.randrange(len(ruts))]
+            intentos += 1
+        if (rut, *clave_horario) in nuevos_paciente or (rut, *clave_horario) in ocupados_paciente:
+            continue
+        nuevos_paciente.add((rut, *clave_horario))
+
+        citas.append({
+            'id': id_inicial + indice,
+            'rut_paciente': rut,
+            'nombre_paciente': nombres_pacientes[rut],
+            'doctor_id': doctor['id'],
+            'nombre_doctor': doctor['nombre'],
+            'fecha': fecha,
+            'hora': hora,
+            'tipo_consulta': TIPOS_CONSULTA[indice % len(TIPOS_CONSULTA)],
+            'estado': 'Agendada',
+            'fecha_creacion': creacion,
+        })
+
+    citas.sort(key=lambda c: (c['fecha'], c['hora'], c['doctor_id']))
+    for i, cita in enumerate(citas):
+        cita['id'] = id_inicial + i
+    return citas
+
+
+def generar_escenario(n_pacientes, n_doctores, n_citas, semilla=42,
+                      pacientes_existentes=None, doctores_existentes=None, id_cita_inicial=1,
+                      ocupados_doctor=None, ocupados_paciente=None):
+    """
+    Genera un escenario completo y determinístico por semilla.
+
+    Las citas se reparten entre los pacientes y doctores nuevos más los existentes,
+    sin usar los horarios ya ocupados (ver generar_citas).
+    """
+    rnd = random.Random(semilla)
+    pacientes_existentes = pacientes_existentes or {}
+    doctores_existentes = doctores_existentes or []
+
+    pacientes = generar_pacientes(n_pacientes, rnd, excluir=pacientes_existentes)
+    id_doctor = max((d['id'] for d in doctores_existentes), default=0) + 1
+    doctores = generar_doctores(n_doctores, rnd, id_inicial=id_doctor)
+
+    todos_pacientes = {**pacientes_existentes, **pacientes}
+    todos_doctores = doctores_existentes + doctores
+    citas = generar_citas(n_citas, todos_pacientes, todos_doctores, rnd, id_inicial=id_cita_inicial,
+                          ocupados_doctor=ocupados_doctor, ocupados_paciente=ocupados_paciente)
+
+    return {'pacientes': pacientes, 'doctores': doctores, 'citas': citas}
+
+
+def sembrar_servidor(url_base, n_pacientes, n_doctores, n_citas, semilla, timeout=300):
+    """Solicita al servidor que genere y cargue el escenario en memoria"""
+    cuerpo = json.dumps({
+        'pacientes': n_pacientes,
+        'doctores': n_doctores,
+        'citas': n_citas,
+        'semilla': semilla,
+    }).encode('utf-8')
+    req = urllib.request.Request(url_base.rstrip('/') + "/api/sembrar", data=cuerpo, method="POST")
+    req.add_header('Content-Type', 'application/json')
+    with urllib.request.urlopen(req, timeout=timeout) as respuesta:
+        return json.loads(respuesta.read())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generador de datos sintéticos")
+    parser.add_argument('-n', '--pacientes', type=int, default=1000, help="Pacientes a generar")
+    parser.add_argument('-m', '--doctores', type=int, default=10, help="Doctores a generar")
+    parser.add_argument('-k', '--citas', type=int, default=10000, help="Citas a generar")
+    parser.add_argument('--semilla', type=int, default=42, help="Semilla aleatoria")
+    parser.add_argument('--url', help="Sembrar directamente en un servidor iniciado con SEMBRADO=1 (ej. http://localhost:5000)")
+    parser.add_argument('--ruts-salida', help="Escribir los RUTs generados (uno por línea)")
+    parser.add_argument('-o', '--salida', help="Escribir el escenario completo como JSON")
+    args = parser.parse_args(argv)
+
+    if args.url:
+        resultado = sembrar_servidor(args.url, args.pacientes, args.doctores, args.citas, args.semilla)
+        print(f"✅ Servidor sembrado: {resultado['pacientes_cargados']} pacientes, "
+              f"{resultado['doctores_cargados']} doctores, {resultado['citas_cargadas']} citas "
+              f"en {resultado['duracion_s']} s")
+        if args.ruts_salida:
+            # La generación de pacientes es determinística: basta con repetirla localmente
+            pacientes = generar_pacientes(args.pacientes, random.Random(args.semilla))
+            with open(args.ruts_salida, 'w', encoding='utf-8') as f:
+                f.write("\n".join(pacientes) + "\n")
+        return 0
+
+    inicio = time.perf_counter()
+    escenario = generar_escenario(args.pacientes, args.doctores, args.citas, args.semilla)
+    print(f"✅ Escenario generado en {time.perf_counter() - inicio:.2f} s: "
+          f"{len(escenario['pacientes'])} pacientes, {len(escenario['doctores'])} doctores, "
+          f"{len(escenario['citas'])} citas", file=sys.stderr)
+
+    if args.ruts_salida:
+        with open(args.ruts_salida, 'w', encoding='utf-8') as f:
+            f.write("\n".join(escenario['pacientes']) + "\n")
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump(escenario, f, ensure_ascii=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
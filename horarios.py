@@ -0,0 +1,107 @@
+"""
+================================================================================
+    REPRESENTACIÓN NORMALIZADA DE HORARIOS
+    Sistema: Consultas Oftalmológicas - Clínica "Visión Clara"
+    Propósito: Convertir fecha/hora a (día ordinal, minuto del día) con un camino
+               rápido y caché, para comparar, ordenar y buscar por rangos
+================================================================================
+"""
+
+from datetime import date
+from functools import lru_cache
+import time
+
+
+DIA_MAXIMO = date.max.toordinal()  # 9999-12-31: último día representable
+
+
+def parsear_fecha(texto):
+    """'YYYY-MM-DD' -> número de día (date.toordinal). ValueError si es inválida"""
+    if not isinstance(texto, str):
+        raise ValueError('La fecha debe ser texto')
+    return _parsear_fecha(texto)
+
+
+@lru_cache(maxsize=4096)
+def _parsear_fecha(texto):
+    # Camino rápido: posiciones fijas, sin strptime
+    if len(texto) != 10 or texto[4] != '-' or texto[7] != '-':
+        raise ValueError(texto)
+    anio, mes, dia = texto[:4], texto[5:7], texto[8:]
+    if not (anio.isdigit() and mes.isdigit() and dia.isdigit()):
+        raise ValueError(texto)
+    return date(int(anio), int(mes), int(dia)).toordinal()
+
+
+def parsear_hora(texto):
+    """'H:MM' o 'HH:MM' (segundos opcionales) -> minuto del día. ValueError si es inválida"""
+    if not isinstance(texto, str):
+        raise ValueError('La hora debe ser texto')
+    return _parsear_hora(texto)
+
+
+@lru_cache(maxsize=2048)
+def _parsear_hora(texto):
+    partes = texto.strip().split(':')
+    if len(partes) not in (2, 3) or not all(p.isdigit() and len(p) <= 2 for p in partes):
+        raise ValueError(texto)
+    horas, minutos = int(partes[0]), int(partes[1])
+    if horas > 23 or minutos > 59 or len(partes[1]) != 2:
+        raise ValueError(texto)
+    if len(partes) == 3 and (len(partes[2]) != 2 or int(partes[2]) > 59):
+        raise ValueError(texto)
+    return horas * 60 + minutos
+
+
+@lru_cache(maxsize=4096)
+def fecha_iso(dia):
+    """Número de día -> 'YYYY-MM-DD'"""
+    return date.fromordinal(dia).isoformat()
+
+
+@lru_cache(maxsize=1440)
+def hora_texto(minuto):
+    """Minuto del día -> 'HH:MM'"""
+    return f"{minuto // 60:02d}:{minuto % 60:02d}"
+
+
+def slot(fecha, hora):
+    """(día, minuto) de una fecha y hora en texto"""
+    return parsear_fecha(fecha), parsear_hora(hora)
+
+
+class Reloj:
+    """
+    Hora local cacheada por segundo: evita llamar a datetime.now() y strftime
+    varias veces por petición.
+    """
+
+    def __init__(self):
+        self._estado = (None, None, None, None)  # (segundo, texto, hoy, minuto): se reemplaza completo
+
+    def _actual(self):
+        segundo = int(time.time())
+        estado = self._estado
+        if estado[0] != segundo:
+            local = time.localtime(segundo)
+            estado = (segundo, time.strftime('%Y-%m-%d %H:%M:%S', local),
+                      date(local.tm_year, local.tm_mon, local.tm_mday).toordinal(),
+                      local.tm_hour * 60 + local.tm_min)
+            self._estado = estado
+        return estado
+
+    def marca(self):
+        """Fecha y hora actual como 'YYYY-MM-DD HH:MM:SS'"""
+        return self._actual()[1]
+
+    def hoy(self):
+        """Número de día de hoy"""
+        return self._actual()[2]
+
+    def ahora(self):
+        """(día, minuto) actual, comparable con los horarios normalizados"""
+        estado = self._actual()
+        return estado[2], estado[3]
+
+
+reloj = Reloj()
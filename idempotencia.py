@@ -0,0 +1,90 @@
+"""
+================================================================================
+    CACHÉ DE IDEMPOTENCIA
+    Sistema: Consultas Oftalmológicas - Clínica "Visión Clara"
+    Propósito: Responder los reintentos con la misma Idempotency-Key usando la
+               respuesta original, sin volver a ejecutar la operación
+================================================================================
+"""
+
+from collections import OrderedDict
+import threading
+import time
+
+
+class EnCurso(Exception):
+    """La petición original con esa clave todavía no termina"""
+
+
+class CuerpoDistinto(Exception):
+    """La clave ya se usó con un cuerpo de petición diferente"""
+
+
+class Entrada:
+    __slots__ = ('huella', 'creada', 'lista', 'respuesta')
+
+    def __init__(self, huella, creada):
+        self.huella = huella
+        self.creada = creada
+        self.lista = threading.Event()
+        self.respuesta = None  # (cuerpo, status, mimetype)
+
+
+class CacheIdempotencia:
+    """
+    Respuestas por Idempotency-Key con expiración (TTL) y tamaño máximo.
+
+    El OrderedDict está en orden de creación: las entradas vencidas y, si se
+    supera `max_entradas`, las más antiguas se descartan desde el frente, así
+    la memoria queda acotada aun con tormentas de reintentos.
+    """
+
+    def __init__(self, ttl=86400.0, max_entradas=10_000):
+        self.ttl = ttl
+        self.max_entradas = max_entradas
+        self.entradas = OrderedDict()
+        self.lock = threading.Lock()
+
+    def reservar(self, clave, huella, espera=5.0):
+        """
+        Devuelve la respuesta guardada para la clave, o None si el llamador debe
+        ejecutar la operación (la clave queda reservada hasta completar/liberar).
+        """
+        ahora = time.monotonic()
+        with self.lock:
+            self._expirar(ahora)
+            entrada = self.entradas.get(clave)
+            if entrada is None:
+                self.entradas[clave] = Entrada(huella, ahora)
+                return None
+        if entrada.huella != huella:
+            raise CuerpoDistinto()
+        # Reintento concurrente: esperar a que la petición original termine
+        if not entrada.lista.wait(espera) or entrada.respuesta is None:
+            raise EnCurso()
+        return entrada.respuesta
+
+    def completar(self, clave, respuesta):
+        with self.lock:
+            entrada = self.entradas.get(clave)
+        if entrada is not None:
+            entrada.respuesta = respuesta
+            entrada.lista.set()
+
+    def liberar(self, clave):
+        """Descarta la reserva (la operación falló y puede reintentarse)"""
+        with self.lock:
+            entrada = self.entradas.pop(clave, None)
+        if entrada is not None:
+            entrada.lista.set()
+
+    def _expirar(self, ahora):
+        limite = ahora - self.ttl
+        while self.entradas:
+            clave = next(iter(self.entradas))
+            if self.entradas[clave].creada > limite and len(self.entradas) < self.max_entradas:
+                break
+            self.entradas.pop(clave).lista.set()
+
+    def __len__(self):
+        return len(self.entradas)
@@ -0,0 +1,109 @@
+"""
+================================================================================
+    LIMITADOR DE TASA Y CONTROL DE ADMISIÓN
+    Sistema: Consultas Oftalmológicas - Clínica "Visión Clara"
+    Propósito: Evitar que un cliente (o un reintento en bucle) sature el proceso
+               y deje sin servicio a la recepción
+================================================================================
+"""
+
+from collections import OrderedDict
+import threading
+import time
+
+
+class LimitadorTasa:
+    """
+    Token bucket por clave (IP, RUT, ...).
+
+    Los cubos se guardan en un OrderedDict ordenado por último acceso: los que
+    llevan más de `expiracion` segundos sin uso se eliminan desde el frente en
+    O(1) amortizado, y `max_claves` acota la memoria ante claves aleatorias.
+    """
+
+    def __init__(self, capacidad, recarga_por_segundo, expiracion=300.0, max_claves=100_000):
+        self.capacidad = float(capacidad)
+        self.recarga = float(recarga_por_segundo)
+        self.expiracion = expiracion
+        self.max_claves = max_claves
+        self.cubos = OrderedDict()  # clave -> [tokens, ultimo_acceso]
+        self.lock = threading.Lock()
+
+    def permitir(self, clave, ahora=None):
+        """Consume un token; devuelve (permitido, segundos_hasta_el_próximo_token)"""
+        ahora = time.monotonic() if ahora is None else ahora
+        with self.lock:
+            cubo = self.cubos.get(clave)
+            if cubo is None:
+                # La memoria solo crece al agregar claves: es el momento de purgar
+                self._expirar(ahora)
+                cubo = self.cubos[clave] = [self.capacidad, ahora]
+            else:
+                cubo[0] = min(self.capacidad, cubo[0] + (ahora - cubo[1]) * self.recarga)
+                cubo[1] = ahora
+                self.cubos.move_to_end(clave)
+
+            if cubo[0] >= 1.0:
+                cubo[0] -= 1.0
+                return True, 0.0
+            return False, (1.0 - cubo[0]) / self.recarga
+
+    def _expirar(self, ahora):
+        limite = ahora - self.expiracion
+        while self.cubos:
+            clave = next(iter(self.cubos))
+            if self.cubos[clave][1] > limite and len(self.cubos) < self.max_claves:
+                break
+            del self.cubos[clave]
+
+    def __len__(self):
+        return len(self.cubos)
+
+
+class Saturado(Exception):
+    """No hay cupo de ejecución ni lugar en la cola de espera"""
+
+
+class ControlAdmision:
+    """
+    Limita las peticiones concurrentes y la cola de espera.
+
+    Si la cola está llena se rechaza de inmediato; si el cupo no se libera
+    dentro de `espera_max` segundos también se rechaza.
+    """
+
+    def __init__(self, max_concurrentes, max_en_cola, espera_max=2.0):
+        self.max_concurrentes = max_concurrentes
+        self.max_en_cola = max_en_cola
+        self.espera_max = espera_max
+        self.activas = 0
+        self.en_cola = 0
+        self.condicion = threading.Condition()
+
+    def entrar(self):
+        with self.condicion:
+            if self.activas < self.max_concurrentes:
+                self.activas += 1
+                return
+            if self.en_cola >= self.max_en_cola:
+                raise Saturado()
+            self.en_cola += 1
+            try:
+                if not self.condicion.wait_for(lambda: self.activas < self.max_concurrentes,
+                                               self.espera_max):
+                    raise Saturado()
+                self.activas += 1
+            finally:
+                self.en_cola -= 1
+
+    def salir(self):
+        with self.condicion:
+            self.activas -= 1
+            self.condicion.notify()
+
+    def __enter__(self):
+        self.entrar()
+        return self
+
+    def __exit__(self, *exc):
+        self.salir()
@@ -0,0 +1,139 @@
+"""
+================================================================================
+    LISTA DE ESPERA
+    Sistema: Consultas Oftalmológicas - Clínica "Visión Clara"
+    Propósito: Registrar pacientes interesados en un doctor y rango de fechas,
+               y asignarles en O(log n) los cupos que se liberan al cancelar
+================================================================================
+"""
+
+import heapq
+import threading
+
+
+class ListaEspera:
+    """
+    Solicitudes de espera con una cola de prioridad por (doctor, día).
+
+    Cada solicitud se inserta en la cola de cada día de su rango; al liberarse
+    un cupo solo se consulta la cola de ese doctor y día. Las solicitudes ya
+    asignadas o canceladas se descartan de forma perezosa al llegar al tope, y
+    las colas se compactan cuando la mitad de sus entradas quedó obsoleta o
+    cuando cambia el día (`hoy`, función opcional) y hay colas de días pasados.
+    Orden: mayor prioridad primero y, a igual prioridad, la más antigua.
+    """
+
+    def __init__(self, hoy=None):
+        self.solicitudes = []  # el id de cada solicitud es su posición + 1
+        self.colas = {}        # (doctor_id, dia) -> heap de (-prioridad, id)
+        self.hoy = hoy
+        self.entradas = 0      # entradas en todas las colas
+        self.obsoletas = 0     # estimación de entradas de solicitudes ya no pendientes
+        self._dia_compactado = None
+        self.lock = threading.Lock()
+
+    def registrar(self, rut, doctor_id, dia_desde, dia_hasta, prioridad=0, **datos):
+        with self.lock:
+            if self.hoy is not None and self.hoy() != self._dia_compactado:
+                self._compactar()
+            solicitud = {
+                'id': len(self.solicitudes) + 1,
+                'rut_paciente': rut,
+                'doctor_id': doctor_id,
+                'dia_desde': dia_desde,
+                'dia_hasta': dia_hasta,
+                'prioridad': prioridad,
+                'estado': 'Pendiente',
+                'cita_id': None,
+                **datos
+            }
+            self.solicitudes.append(solicitud)
+            entrada = (-prioridad, solicitud['id'])
+            for dia in range(dia_desde, dia_hasta + 1):
+                heapq.heappush(self.colas.setdefault((doctor_id, dia), []), entrada)
+            self.entradas += dia_hasta - dia_desde + 1
+            return solicitud
+
+    def obtener(self, solicitud_id):
+        if 1 <= solicitud_id <= len(self.solicitudes):
+            return self.solicitudes[solicitud_id - 1]
+        return None
+
+    def cancelar(self, solicitud_id):
+        """Retira una solicitud pendiente (sus entradas se descartan al llegar al tope)"""
+        with self.lock:
+            solicitud = self.obtener(solicitud_id)
+            if solicitud is None or solicitud['estado'] != 'Pendiente':
+                return None
+            solicitud['estado'] = 'Cancelada'
+            self._retirar(solicitud, solicitud['dia_hasta'] - solicitud['dia_desde'] + 1)
+            return solicitud
+
+    def asignar(self, doctor_id, dia, disponible, reservar):
+        """
+        Busca la solicitud pendiente de mayor prioridad para el cupo liberado.
+
+        `disponible(solicitud)` indica si el paciente puede tomar el cupo (ej. no
+        tiene otra cita a esa hora); `reservar(solicitud)` agenda la cita y
+        devuelve su id. Devuelve la solicitud asignada o None.
+        """
+        with self.lock:
+            clave = (doctor_id, dia)
+            cola = self.colas.get(clave)
+            omitidas = []
+            asignada = None
+            while cola:
+                entrada = heapq.heappop(cola)
+                self.entradas -= 1
+                solicitud = self.solicitudes[entrada[1] - 1]
+                if solicitud['estado'] != 'Pendiente':
+                    self.obsoletas -= 1
+                    continue
+                if not disponible(solicitud):
+                    omitidas.append(entrada)
+                    continue
+                solicitud['cita_id'] = reservar(solicitud)
+                solicitud['estado'] = 'Asignada'
+                asignada = solicitud
+                break
+            for entrada in omitidas:
+                heapq.heappush(cola, entrada)
+            self.entradas += len(omitidas)
+            if cola is not None and not cola:
+                del self.colas[clave]
+            if asignada is not None:
+                self._retirar(asignada, asignada['dia_hasta'] - asignada['dia_desde'])
+            return asignada
+
+    def _retirar(self, solicitud, entradas):
+        """Cuenta como obsoletas las entradas de una solicitud que dejó de estar pendiente"""
+        self.obsoletas += entradas
+        if self.obsoletas > 1024 and self.obsoletas * 2 > self.entradas:
+            self._compactar()
+
+    def _compactar(self):
+        """Rehace las colas sin solicitudes resueltas ni días pasados (requiere el lock)"""
+        hoy = self.hoy() if self.hoy is not None else None
+        colas = {}
+        for (doctor_id, dia), cola in self.colas.items():
+            if hoy is not None and dia < hoy:
+                continue
+            vigentes = [e for e in cola if self.solicitudes[e[1] - 1]['estado'] == 'Pendiente']
+            if vigentes:
+                heapq.heapify(vigentes)
+                colas[(doctor_id, dia)] = vigentes
+        self.colas = colas
+        self.entradas = sum(len(cola) for cola in colas.values())
+        self.obsoletas = 0
+        self._dia_compactado = hoy
+
+    def pendientes(self, doctor_id=None):
+        return [s for s in self.solicitudes
+                if s['estado'] == 'Pendiente' and (doctor_id is None or s['doctor_id'] == doctor_id)]
+
+    def limpiar(self):
+        with self.lock:
+            self.solicitudes.clear()
+            self.colas.clear()
+            self.entradas = 0
+            self.obsoletas = 0
@@ -0,0 +1,165 @@
+"""
+================================================================================
+    PERFILADOR DE PETICIONES
+    Sistema: Consultas Oftalmológicas - Clínica "Visión Clara"
+    Propósito: Capturar dónde se va el tiempo de las peticiones lentas (cProfile
+               por muestreo o a pedido, y pilas muestreadas) sin costo si está
+               desactivado
+================================================================================
+"""
+
+import cProfile
+import io
+import itertools
+import pstats
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+
+
+class PeticionEnCurso:
+    """Estado de una petición observada por el perfilador"""
+
+    __slots__ = ('ruta', 'metodo', 'inicio', 'perfil', 'forzado', 'muestras')
+
+    def __init__(self, ruta, metodo, perfil, forzado):
+        self.ruta = ruta
+        self.metodo = metodo
+        self.inicio = time.perf_counter()
+        self.perfil = perfil
+        self.forzado = forzado
+        self.muestras = None  # Counter de pilas, solo si superó el umbral
+
+
+class Perfilador:
+    """
+    Perfilado opcional de peticiones con un anillo de las últimas lentas.
+
+    - Una fracción `tasa_muestreo` de peticiones (o las que lo pidan
+      explícitamente) se ejecuta bajo cProfile.
+    - Un hilo muestreador toma la pila de cualquier petición que lleve más de
+      `umbral_ms` en curso, así hay perfil aunque no le tocara cProfile.
+    - Se guardan las últimas `max_perfiles` peticiones que superaron el umbral
+      (y todas las forzadas); el informe de cProfile se arma al consultarlo.
+    """
+
+    def __init__(self, umbral_ms=500, tasa_muestreo=0.0, max_perfiles=20,
+                 intervalo_muestreo=0.01, max_lineas=40):
+        self.umbral = umbral_ms / 1000
+        self.tasa_muestreo = tasa_muestreo
+        self.intervalo_muestreo = intervalo_muestreo
+        self.max_lineas = max_lineas
+        self.perfiles = deque(maxlen=max_perfiles)
+        self._ids = itertools.count(1)
+        self._en_curso = {}  # id de hilo -> PeticionEnCurso
+        self._hilo = None
+        self._lock = threading.Lock()
+
+    def comenzar(self, ruta, metodo, forzado=False):
+        """Registra el inicio de una petición; activa cProfile si corresponde"""
+        if self._hilo is None:
+            self._iniciar_muestreador()
+
+        perfil = None
+        if forzado or (self.tasa_muestreo and random.random() < self.tasa_muestreo):
+            perfil = cProfile.Profile()
+            try:
+                perfil.enable()
+            except ValueError:
+                # Otro perfilador ya activo (en 3.12+ cProfile es global al intérprete)
+                perfil = None
+
+        estado = PeticionEnCurso(ruta, metodo, perfil, forzado)
+        self._en_curso[threading.get_ident()] = estado
+        return estado
+
+    def terminar(self, estado, codigo):
+        """Cierra la medición y guarda el perfil si la petición fue lenta o forzada"""
+        duracion = time.perf_counter() - estado.inicio
+        if estado.perfil is not None:
+            estado.perfil.disable()
+        self._en_curso.pop(threading.get_ident(), None)
+
+        if duracion < self.umbral and not estado.forzado:
+            return None
+        registro = {
+            'id': next(self._ids),
+            'fecha': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'metodo': estado.metodo,
+            'ruta': estado.ruta,
+            'codigo': codigo,
+            'duracion_ms': round(duracion * 1000, 1),
+            'forzado': estado.forzado,
+            'cprofile': estado.perfil,
+            'muestras': estado.muestras,
+        }
+        self.perfiles.append(registro)
+        return registro
+
+    def _iniciar_muestreador(self):
+        with self._lock:
+            if self._hilo is None:
+                self._hilo = threading.Thread(target=self._muestrear, name='perfilador', daemon=True)
+                self._hilo.start()
+
+    def _muestrear(self):
+        while True:
+            time.sleep(self.intervalo_muestreo)
+            if not self._en_curso:
+                continue
+            limite = time.perf_counter() - self.umbral
+            lentas = [(tid, e) for tid, e in list(self._en_curso.items()) if e.inicio <= limite]
+            if not lentas:
+                continue
+            marcos = sys._current_frames()
+            for tid, estado in lentas:
+                marco = marcos.get(tid)
+                if marco is None:
+                    continue
+                if estado.muestras is None:
+                    estado.muestras = Counter()
+                estado.muestras[self._pila(marco)] += 1
+
+    @staticmethod
+    def _pila(marco):
+        """Pila en formato plegado: externa;...;interna"""
+        partes = []
+        while marco is not None:
+            codigo = marco.f_code
+            partes.append(f"{codigo.co_name} ({codigo.co_filename.rsplit('/', 1)[-1]}:{marco.f_lineno})")
+            marco = marco.f_back
+        return ';'.join(reversed(partes))
+
+    def resumen(self):
+        """Perfiles guardados sin el detalle, del más reciente al más antiguo"""
+        return [{**self._cabecera(r),
+                 'tiene_cprofile': r['cprofile'] is not None,
+                 'muestras': sum(r['muestras'].values()) if r['muestras'] else 0}
+                for r in reversed(self.perfiles)]
+
+    def detalle(self, perfil_id):
+        """Perfil completo: informe de cProfile y pilas muestreadas más frecuentes"""
+        for registro in self.perfiles:
+            if registro['id'] == perfil_id:
+                break
+        else:
+            return None
+
+        resultado = self._cabecera(registro)
+        if registro['cprofile'] is not None:
+            salida = io.StringIO()
+            pstats.Stats(registro['cprofile'], stream=salida).sort_stats('cumulative').print_stats(self.max_lineas)
+            resultado['cprofile'] = salida.getvalue()
+        if registro['muestras']:
+            resultado['pilas'] = [{'pila': pila, 'muestras': n}
+                                  for pila, n in registro['muestras'].most_common(self.max_lineas)]
+        return resultado
+
+    @staticmethod
+    def _cabecera(registro):
+        return {k: registro[k] for k in ('id', 'fecha', 'metodo', 'ruta', 'codigo', 'duracion_ms', 'forzado')}
+
+    def limpiar(self):
+        self.perfiles.clear()
@@ -0,0 +1,347 @@
+"""
+================================================================================
+    PRUEBAS DE LA API (SIN NAVEGADOR)
+    Sistema: Consultas Oftalmológicas - Clínica "Visión Clara"
+    Framework: cliente de pruebas de Flask, en el mismo proceso
+================================================================================
+"""
+
+from collections import Counter
+from contextlib import contextmanager
+import os
+import sys
+
+# Sin limitador ni archivo de auditoría: las pruebas hacen muchas peticiones seguidas
+os.environ.setdefault('LIMITE_TASA', '0')
+os.environ.setdefault('AUDITORIA_ARCHIVO', os.devnull)
+
+import sistema_consultas as sc
+from horarios import fecha_iso, hora_texto, reloj
+
+
+PACIENTE_1 = "12345678-9"
+PACIENTE_2 = "98765432-1"
+
+
+@contextmanager
+def configuracion(**valores):
+    """Cambia app.config durante una prueba y restaura los valores originales"""
+    originales = {clave: sc.app.config.get(clave) for clave in valores}
+    sc.app.config.update(valores)
+    try:
+        yield
+    finally:
+        sc.app.config.update(originales)
+
+
+def fecha_futura(dias):
+    return fecha_iso(reloj.hoy() + dias)
+
+
+def agendar(cliente, rut, doctor_id, fecha, hora='10:00', **kwargs):
+    return cliente.post('/api/agendar', json={
+        'rut_paciente': rut, 'doctor_id': doctor_id, 'fecha': fecha, 'hora': hora,
+        'tipo_consulta': 'Control de rutina'
+    }, **kwargs)
+
+
+def agendar_serie(cliente, rut, doctor_id, fecha_inicio, regla, hora='10:00'):
+    return cliente.post('/api/agendar/serie', json={
+        'rut_paciente': rut, 'doctor_id': doctor_id, 'fecha_inicio': fecha_inicio, 'hora': hora,
+        'tipo_consulta': 'Control de rutina', 'regla': regla
+    })
+
+
+def prueba_1_serie_exitosa(cliente):
+    """PRUEBA 1: Una serie semanal sin choques agenda todas sus ocurrencias"""
+    r = agendar_serie(cliente, PACIENTE_1, 1, fecha_futura(7), {'frecuencia': 'semanas', 'cantidad': 4})
+    assert r.status_code == 200, f"Error: status {r.status_code} {r.get_json()}"
+    citas = r.get_json()['citas']
+    assert [c['fecha'] for c in citas] == [fecha_futura(7 * i) for i in range(1, 5)], "Error: fechas de la serie"
+    assert len({c['serie_id'] for c in citas}) == 1, "Error: las citas no comparten serie_id"
+    print("   ✅ Serie de 4 citas agendada")
+
+
+def prueba_2_serie_todo_en_conflicto(cliente):
+    """PRUEBA 2: Si todas las ocurrencias chocan se informan todas y no se agenda nada"""
+    for semana in range(1, 4):
+        agendar(cliente, PACIENTE_1, 2, fecha_futura(7 * semana))
+    antes = len(sc.citas)
+
+    r = agendar_serie(cliente, PACIENTE_2, 2, fecha_futura(7), {'frecuencia': 'semanas', 'cantidad': 3})
+    assert r.status_code == 400, f"Error: status {r.status_code}"
+    conflictos = r.get_json()['conflictos']
+    assert [c['fecha'] for c in conflictos] == [fecha_futura(7 * s) for s in range(1, 4)], \
+        f"Error: conflictos {conflictos}"
+    assert len(sc.citas) == antes, "Error: se agendaron citas de una serie rechazada"
+    print("   ✅ 3 conflictos informados, ninguna cita nueva")
+
+
+def prueba_3_serie_parcial_rechazada(cliente):
+    """PRUEBA 3: Un solo choque, o una fecha fuera de rango, rechaza la serie completa"""
+    agendar(cliente, PACIENTE_1, 3, fecha_futura(21))
+    antes = len(sc.citas)
+
+    r = agendar_serie(cliente, PACIENTE_2, 3, fecha_futura(7), {'frecuencia': 'semanas', 'cantidad': 4})
+    assert r.status_code == 400, f"Error: status {r.status_code}"
+    assert [c['fecha'] for c in r.get_json()['conflictos']] == [fecha_futura(21)], "Error: conflicto esperado"
+
+    r = agendar_serie(cliente, PACIENTE_2, 3, fecha_futura(7), {'intervalo': 1_000_000_000, 'cantidad': 2})
+    assert r.status_code == 400, f"Error: serie fuera de rango devolvió {r.status_code}"
+    r = agendar_serie(cliente, PACIENTE_2, 3, '9999-12-01', {'frecuencia': 'semanas', 'cantidad': 10})
+    assert r.status_code == 400, f"Error: serie hasta el año 10000 devolvió {r.status_code}"
+
+    assert len(sc.citas) == antes, "Error: quedaron citas huérfanas de una serie rechazada"
+    print("   ✅ Series parciales rechazadas sin citas huérfanas")
+
+
+def prueba_4_idempotencia(cliente):
+    """PRUEBA 4: Un reintento con la misma Idempotency-Key repite la respuesta sin duplicar"""
+    fecha = fecha_futura(3)
+    clave = {'Idempotency-Key': 'prueba-idempotencia-1'}
+
+    original = agendar(cliente, PACIENTE_1, 1, fecha, headers=clave)
+    assert original.status_code == 200, f"Error: status {original.status_code}"
+    reintento = agendar(cliente, PACIENTE_1, 1, fecha, headers=clave)
+    assert reintento.status_code == 200, f"Error: reintento devolvió {reintento.status_code}"
+    assert reintento.headers.get('Idempotent-Replayed') == 'true', "Error: falta Idempotent-Replayed"
+    assert reintento.get_json() == original.get_json(), "Error: la respuesta repetida difiere"
+    assert len(sc.citas) == 1, f"Error: se esperaba 1 cita, hay {len(sc.citas)}"
+
+    otra = agendar(cliente, PACIENTE_1, 1, fecha, hora='11:00', headers=clave)
+    assert otra.status_code == 422, f"Error: clave reutilizada con otros datos devolvió {otra.status_code}"
+
+    # Una respuesta de error no se recuerda: la misma clave puede reintentarse
+    clave = {'Idempotency-Key': 'prueba-idempotencia-2'}
+    assert agendar(cliente, PACIENTE_2, 1, fecha, headers=clave).status_code == 400, "Error: choque esperado"
+    assert agendar(cliente, PACIENTE_2, 1, fecha, headers=clave).status_code == 400, \
+        "Error: el reintento de una petición fallida no se volvió a ejecutar"
+    print("   ✅ Reintento repetido, clave reutilizada rechazada (422)")
+
+
+def prueba_5_reasignacion_lista_espera(cliente):
+    """PRUEBA 5: Cancelar una cita agenda el cupo al primer paciente en lista de espera"""
+    fecha = fecha_futura(5)
+    cita = agendar(cliente, PACIENTE_1, 2, fecha).get_json()['cita']
+    r = cliente.post('/api/lista-espera', json={
+        'rut_paciente': PACIENTE_2, 'doctor_id': 2, 'desde': fecha_futura(4), 'hasta': fecha_futura(6)
+    })
+    assert r.status_code == 200, f"Error: inscripción devolvió {r.status_code}"
+    solicitud_id = r.get_json()['solicitud']['id']
+
+    r = cliente.post(f"/api/cancelar/{cita['id']}")
+    reasignada = r.get_json().get('reasignada')
+    assert reasignada, "Error: el cupo liberado no se reasignó"
+    assert reasignada['rut_paciente'] == PACIENTE_2, "Error: se reasignó a otro paciente"
+    assert (reasignada['fecha'], reasignada['hora']) == (fecha, '10:00'), "Error: horario reasignado"
+    assert sc.lista_espera.obtener(solicitud_id)['estado'] == 'Asignada', "Error: la solicitud sigue pendiente"
+    assert cliente.get('/api/lista-espera').get_json() == [], "Error: quedan solicitudes pendientes"
+    print("   ✅ Cupo reasignado al paciente en espera")
+
+
+def prueba_6_sin_reasignacion_en_el_pasado(cliente):
+    """PRUEBA 6: Cancelar una cita pasada (ayer o más temprano hoy) no agenda a nadie"""
+    hoy, minuto_actual = reloj.ahora()
+    horarios = [(fecha_iso(hoy - 1), '10:00')]
+    if minuto_actual > 0:
+        horarios.append((fecha_iso(hoy), hora_texto(minuto_actual - 1)))
+    sc.lista_espera.registrar(PACIENTE_2, 1, hoy - 1, hoy + 1,
+                              tipo_consulta='Control de rutina', fecha_creacion=reloj.marca())
+
+    for fecha, hora in horarios:
+        # La API no permite agendar en el pasado: se carga directamente
+        pasada = sc.crear_cita(sc.pacientes[PACIENTE_1], sc.doctores[0], fecha, hora,
+                               'Control de rutina', reloj.marca())
+        r = cliente.post(f"/api/cancelar/{pasada['id']}")
+        assert r.status_code == 200, f"Error: status {r.status_code}"
+        assert 'reasignada' not in r.get_json(), f"Error: se reasignó el cupo pasado {fecha} {hora}"
+    assert all(c['rut_paciente'] == PACIENTE_1 for c in sc.citas), "Error: se agendó al paciente en espera"
+    print(f"   ✅ {len(horarios)} cupo(s) pasado(s) no reasignado(s)")
+
+
+def prueba_7_sembrado_sin_dobles_reservas(cliente):
+    """PRUEBA 7: Sembrar dos veces no repite horarios de doctor ni de paciente"""
+    with configuracion(SEMBRADO_ACTIVO=False):
+        r = cliente.post('/api/sembrar', json={'pacientes': 10, 'doctores': 0, 'citas': 10})
+        assert r.status_code == 404, f"Error: sembrado desactivado devolvió {r.status_code}"
+
+    agendar(cliente, PACIENTE_1, 1, fecha_futura(1), hora='08:00')
+    with configuracion(SEMBRADO_ACTIVO=True):
+        for semilla in (1, 2):
+            r = cliente.post('/api/sembrar', json={'pacientes': 20, 'doctores': 0, 'citas': 150,
+                                                   'semilla': semilla})
+            assert r.status_code == 200, f"Error: sembrado devolvió {r.status_code}"
+            assert r.get_json()['citas_cargadas'] == 150, "Error: citas cargadas"
+
+    por_doctor = Counter((c['doctor_id'], c['fecha'], c['hora']) for c in sc.citas)
+    por_paciente = Counter((c['rut_paciente'], c['fecha'], c['hora']) for c in sc.citas)
+    assert max(por_doctor.values()) == 1, "Error: un doctor tiene dos citas en el mismo horario"
+    assert max(por_paciente.values()) == 1, "Error: un paciente tiene dos citas en el mismo horario"
+    assert len(sc.horarios_doctor) == len(sc.citas) == 301, "Error: el índice perdió horarios"
+    print("   ✅ 301 citas sin dobles reservas")
+
+
+def prueba_8_horarios_normalizados(cliente):
+    """PRUEBA 8: "9:00" y "09:00" son el mismo horario; la hora se guarda en formato canónico"""
+    fecha = fecha_futura(2)
+    r = agendar(cliente, PACIENTE_1, 1, fecha, hora='9:00')
+    assert r.status_code == 200, f"Error: status {r.status_code}"
+    assert r.get_json()['cita']['hora'] == '09:00', "Error: la hora no se guardó como HH:MM"
+
+    r = agendar(cliente, PACIENTE_1, 1, fecha, hora='09:00')
+    assert r.status_code == 400, f"Error: el mismo paciente y doctor a las 09:00 devolvió {r.status_code}"
+    r = agendar(cliente, PACIENTE_2, 1, fecha, hora='09:00')
+    assert r.status_code == 400, f"Error: doble reserva del doctor devolvió {r.status_code}"
+    r = agendar(cliente, PACIENTE_1, 2, fecha, hora='09:00:00')
+    assert r.status_code == 400, f"Error: doble reserva del paciente devolvió {r.status_code}"
+
+    r = agendar(cliente, PACIENTE_2, 2, fecha, hora='10:00:00')
+    assert r.status_code == 200, f"Error: status {r.status_code}"
+    assert r.get_json()['cita']['hora'] == '10:00', "Error: '10:00:00' no se guardó como '10:00'"
+
+    for hora in ('25:00', '10:5', '09:00:99', 'diez'):
+        r = agendar(cliente, PACIENTE_2, 3, fecha, hora=hora)
+        assert r.status_code == 400, f"Error: hora inválida '{hora}' devolvió {r.status_code}"
+    assert len(sc.citas) == 2, f"Error: se esperaban 2 citas, hay {len(sc.citas)}"
+    print("   ✅ Horarios equivalentes detectados y horas inválidas rechazadas")
+
+
+def prueba_9_perfiles_administrativos(cliente):
+    """PRUEBA 9: Los perfiles exigen perfilado activo y ADMIN_TOKEN; X-Perfilar captura uno"""
+    token = {'X-Admin-Token': 'secreto'}
+    with configuracion(PERFILADO_ACTIVO=False, ADMIN_TOKEN='secreto'):
+        r = cliente.get('/api/admin/perfiles', headers=token)
+        assert r.status_code == 404, f"Error: perfilado desactivado devolvió {r.status_code}"
+        r = cliente.get('/api/estado', headers={'X-Perfilar': '1'})
+        assert 'X-Perfil-Id' not in r.headers, "Error: se perfiló con el perfilado desactivado"
+
+    with configuracion(PERFILADO_ACTIVO=True, ADMIN_TOKEN=None):
+        r = cliente.get('/api/admin/perfiles', headers=token)
+        assert r.status_code == 403, f"Error: sin ADMIN_TOKEN devolvió {r.status_code}"
+
+    sc.perfilador.limpiar()
+    umbral = sc.perfilador.umbral
+    try:
+        with configuracion(PERFILADO_ACTIVO=True, ADMIN_TOKEN='secreto'):
+            for cabeceras in ({}, {'X-Admin-Token': 'otro'}):
+                r = cliente.get('/api/admin/perfiles', headers=cabeceras)
+                assert r.status_code == 403, f"Error: token {cabeceras or 'ausente'} devolvió {r.status_code}"
+
+            r = cliente.get('/api/estado')
+            assert 'X-Perfil-Id' not in r.headers, "Error: se guardó una petición rápida"
+            r = cliente.get('/api/estado', headers={'X-Perfilar': '1'})
+            forzado = r.headers.get('X-Perfil-Id')
+            assert forzado, "Error: X-Perfilar no devolvió X-Perfil-Id"
+
+            sc.perfilador.umbral = 0  # toda petición cuenta como lenta
+            r = cliente.get(f'/api/paciente/{PACIENTE_1}')
+            lento = r.headers.get('X-Perfil-Id')
+            assert lento, "Error: la petición lenta no se capturó"
+
+            perfiles = cliente.get('/api/admin/perfiles', headers=token).get_json()['perfiles']
+            assert [str(p['id']) for p in perfiles] == [lento, forzado], f"Error: perfiles {perfiles}"
+            assert perfiles[0]['ruta'] == '/api/paciente/<rut>', "Error: la ruta guardada incluye el RUT"
+            detalle = cliente.get(f'/api/admin/perfiles/{forzado}', headers=token).get_json()
+            assert detalle['forzado'] and 'estado_sistema' in detalle['cprofile'], "Error: falta el informe de cProfile"
+            r = cliente.get('/api/admin/perfiles/9999', headers=token)
+            assert r.status_code == 404, f"Error: perfil inexistente devolvió {r.status_code}"
+    finally:
+        sc.perfilador.umbral = umbral
+        sc.perfilador.limpiar()
+    print("   ✅ Acceso protegido y perfiles capturados")
+
+
+def prueba_10_agenda_por_rangos(cliente):
+    """PRUEBA 10: Agenda por día, semana (lunes a domingo) y rango, ordenada entre doctores"""
+    hoy = reloj.hoy()
+    lunes = hoy + 7 - (hoy - 1) % 7  # el día ordinal 1 fue lunes
+    miercoles, domingo = lunes + 2, lunes + 6
+    reservas = [
+        (PACIENTE_1, 1, lunes - 1, '12:00'),   # domingo anterior: fuera de la semana
+        (PACIENTE_1, 1, lunes, '08:00'),
+        (PACIENTE_2, 1, miercoles, '09:00'),
+        (PACIENTE_1, 3, miercoles, '10:00'),   # se cancela
+        (PACIENTE_1, 2, miercoles, '11:00'),
+        (PACIENTE_2, 1, domingo, '17:00'),
+        (PACIENTE_2, 2, lunes + 7, '08:00'),   # lunes siguiente: fuera de la semana
+    ]
+    ids = {}
+    for rut, doctor_id, dia, hora in reservas:
+        r = agendar(cliente, rut, doctor_id, fecha_iso(dia), hora=hora)
+        assert r.status_code == 200, f"Error: no se pudo agendar {fecha_iso(dia)} {hora}"
+        ids[(dia, hora)] = r.get_json()['cita']['id']
+    cliente.post(f"/api/cancelar/{ids[(miercoles, '10:00')]}")
+
+    def consultar(consulta):
+        r = cliente.get(f'/api/agenda?{consulta}')
+        assert r.status_code == 200, f"Error: '{consulta}' devolvió {r.status_code}"
+        datos = r.get_json()
+        return datos, [(c['fecha'], c['hora'], c['doctor_id']) for c in datos['citas']]
+
+    datos, citas = consultar(f'fecha={fecha_iso(miercoles)}')
+    assert (datos['desde'], datos['hasta']) == (fecha_iso(miercoles),) * 2, "Error: rango de la vista día"
+    assert citas == [(fecha_iso(miercoles), '09:00', 1), (fecha_iso(miercoles), '11:00', 2)], \
+        f"Error: vista día {citas}"
+    _, citas = consultar(f'fecha={fecha_iso(miercoles)}&incluir_canceladas=1')
+    assert [(h, d) for _, h, d in citas] == [('09:00', 1), ('10:00', 3), ('11:00', 2)], \
+        f"Error: orden entre doctores con canceladas {citas}"
+
+    datos, citas = consultar(f'fecha={fecha_iso(miercoles)}&vista=semana')
+    assert (datos['desde'], datos['hasta']) == (fecha_iso(lunes), fecha_iso(domingo)), \
+        f"Error: semana {datos['desde']} - {datos['hasta']}"
+    assert [(f, h) for f, h, _ in citas] == [(fecha_iso(lunes), '08:00'), (fecha_iso(miercoles), '09:00'),
+                                             (fecha_iso(miercoles), '11:00'), (fecha_iso(domingo), '17:00')], \
+        f"Error: vista semana {citas}"
+    _, citas = consultar(f'fecha={fecha_iso(domingo)}&vista=semana&doctor_id=1')
+    assert [h for _, h, _ in citas] == ['08:00', '09:00', '17:00'], f"Error: semana del doctor 1 {citas}"
+
+    _, citas = consultar(f'desde={fecha_iso(lunes - 1)}&hasta={fecha_iso(lunes + 7)}')
+    assert len(citas) == 6 and citas == sorted(citas), f"Error: rango desde/hasta {citas}"
+    consultar(f'desde={fecha_iso(lunes)}&hasta={fecha_iso(lunes + 91)}')
+    for consulta in (f'desde={fecha_iso(lunes)}&hasta={fecha_iso(lunes + 92)}',
+                     f'desde={fecha_iso(lunes)}&hasta={fecha_iso(lunes - 1)}',
+                     f'fecha={fecha_iso(lunes)}&vista=mes'):
+        r = cliente.get(f'/api/agenda?{consulta}')
+        assert r.status_code == 400, f"Error: '{consulta}' devolvió {r.status_code}"
+    print("   ✅ Vistas día/semana, rangos, límite de 92 días y orden entre doctores")
+
+
+def ejecutar_todas_las_pruebas():
+    """Ejecuta todas las pruebas; devuelve 0 si todas pasan"""
+    print("\n" + "="*80)
+    print("  PRUEBAS DE LA API - SISTEMA DE CONSULTAS")
+    print("="*80)
+
+    cliente = sc.app.test_client()
+    pruebas = [
+        prueba_1_serie_exitosa,
+        prueba_2_serie_todo_en_conflicto,
+        prueba_3_serie_parcial_rechazada,
+        prueba_4_idempotencia,
+        prueba_5_reasignacion_lista_espera,
+        prueba_6_sin_reasignacion_en_el_pasado,
+        prueba_7_sembrado_sin_dobles_reservas,
+        prueba_8_horarios_normalizados,
+        prueba_9_perfiles_administrativos,
+        prueba_10_agenda_por_rangos,
+    ]
+
+    fallidas = 0
+    for i, prueba in enumerate(pruebas, 1):
+        print(f"\n[PRUEBA {i}] {prueba.__doc__.split(': ', 1)[1]}")
+        cliente.post('/api/limpiar')
+        try:
+            prueba(cliente)
+        except AssertionError as e:
+            fallidas += 1
+            print(f"   ❌ {e}")
+
+    print("\n" + "="*80)
+    print(f"  ✅ Pruebas exitosas: {len(pruebas) - fallidas}")
+    print(f"  ❌ Pruebas fallidas: {fallidas}")
+    print("="*80)
+    return 1 if fallidas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(ejecutar_todas_las_pruebas())
@@ -16,6 +16,11 @@ from selenium.webdriver.firefox.options import Options
 import time
 import os
 
+from reporte_pruebas import CronometroPruebas, DriverCronometrado
+
+
+cronometro = CronometroPruebas("Sistema de Consultas", "Firefox")
+
 
 def iniciar_driver():
     """Configura e inicia el WebDriver de Firefox"""
@@ -40,7 +45,7 @@ def iniciar_driver():
 def limpiar_citas(driver):
     """Limpia todas las citas antes de ejecutar pruebas"""
     driver.get("http://localhost:5000/api/limpiar")
-    time.sleep(1)
+    cronometro.esperar(1)
 
 
 def prueba_1_carga_pagina(driver):
@@ -48,7 +53,7 @@ def prueba_1_carga_pagina(driver):
     print("\n[PRUEBA 1] Verificando carga de la página principal...")
     
     driver.get("http://localhost:5000")
-    time.sleep(2)
+    cronometro.esperar(2)
     
     # Verificar título
     titulo = driver.title
@@ -72,7 +77,7 @@ def prueba_2_agendar_cita_exitosa(driver):
     print("\n[PRUEBA 2] Agendando cita con datos válidos...")
     
     driver.get("http://localhost:5000")
-    time.sleep(1)
+    cronometro.esperar(1)
     
     # Llenar formulario
     driver.find_element(By.ID, "rut-paciente").send_keys("12345678-9")
@@ -108,12 +113,12 @@ def prueba_3_validacion_campos_vacios(driver):
     print("\n[PRUEBA 3] Verificando validación de campos requeridos...")
     
     driver.get("http://localhost:5000")
-    time.sleep(1)
+    cronometro.esperar(1)
     
     # Intentar enviar formulario vacío
     boton_enviar = driver.find_element(By.CSS_SELECTOR, "button[type='submit']")
     boton_enviar.click()
-    time.sleep(1)
+    cronometro.esperar(1)
     
     # Verificar que el campo RUT tiene validación HTML5
     campo_rut = driver.find_element(By.ID, "rut-paciente")
@@ -129,7 +134,7 @@ def prueba_4_validacion_fecha_pasada(driver):
     print("\n[PRUEBA 4] Verificando rechazo de fechas pasadas...")
     
     driver.get("http://localhost:5000")
-    time.sleep(1)
+    cronometro.esperar(1)
     
     # Intentar agendar con fecha pasada
     driver.find_element(By.ID, "rut-paciente").send_keys("12345678-9")
@@ -164,17 +169,17 @@ def prueba_5_consultar_citas(driver):
     print("\n[PRUEBA 5] Consultando citas agendadas...")
     
     driver.get("http://localhost:5000")
-    time.sleep(1)
+    cronometro.esperar(1)
     
     # Cambiar a tab de consultar
     tab_consultar = driver.find_elements(By.CLASS_NAME, "tab-button")[1]
     tab_consultar.click()
-    time.sleep(1)
+    cronometro.esperar(1)
     
     # Buscar todas las citas
     boton_buscar = driver.find_element(By.XPATH, "//button[contains(text(), 'Buscar Citas')]")
     boton_buscar.click()
-    time.sleep(2)
+    cronometro.esperar(2)
     
     # Verificar que se muestran las citas
     lista_citas = driver.find_element(By.ID, "citas-list")
@@ -189,18 +194,18 @@ def prueba_6_consultar_historial(driver):
     print("\n[PRUEBA 6] Consultando historial médico...")
     
     driver.get("http://localhost:5000")
-    time.sleep(1)
+    cronometro.esperar(1)
     
     # Cambiar a tab de historial
     tab_historial = driver.find_elements(By.CLASS_NAME, "tab-button")[2]
     tab_historial.click()
-    time.sleep(1)
+    cronometro.esperar(1)
     
     # Ingresar RUT y buscar
     driver.find_element(By.ID, "rut-historial").send_keys("12345678-9")
     boton_ver = driver.find_element(By.XPATH, "//button[contains(text(), 'Ver Historial')]")
     boton_ver.click()
-    time.sleep(2)
+    cronometro.esperar(2)
     
     # Verificar que se muestra el historial
     historial = driver.find_element(By.ID, "historial-container")
@@ -216,18 +221,18 @@ def prueba_7_validacion_paciente_inexistente(driver):
     print("\n[PRUEBA 7] Verificando validación de paciente inexistente...")
     
     driver.get("http://localhost:5000")
-    time.sleep(1)
+    cronometro.esperar(1)
     
     # Cambiar a tab de historial
     tab_historial = driver.find_elements(By.CLASS_NAME, "tab-button")[2]
     tab_historial.click()
-    time.sleep(1)
+    cronometro.esperar(1)
     
     # Buscar paciente que no existe
     driver.find_element(By.ID, "rut-historial").send_keys("99999999-9")
     boton_ver = driver.find_element(By.XPATH, "//button[contains(text(), 'Ver Historial')]")
     boton_ver.click()
-    time.sleep(2)
+    cronometro.esperar(2)
     
     # Verificar mensaje de error
     historial = driver.find_element(By.ID, "historial-container")
@@ -242,17 +247,17 @@ def prueba_8_estado_sistema(driver):
     print("\n[PRUEBA 8] Verificando estado del sistema...")
     
     driver.get("http://localhost:5000")
-    time.sleep(1)
+    cronometro.esperar(1)
     
     # Cambiar a tab de estado
     tab_estado = driver.find_elements(By.CLASS_NAME, "tab-button")[3]
     tab_estado.click()
-    time.sleep(1)
+    cronometro.esperar(1)
     
     # Actualizar estado
     boton_actualizar = driver.find_element(By.XPATH, "//button[contains(text(), 'Actualizar Estado')]")
     boton_actualizar.click()
-    time.sleep(2)
+    cronometro.esperar(2)
     
     # Verificar que se muestra información del sistema
     estado = driver.find_element(By.ID, "estado-container")
@@ -268,7 +273,7 @@ def prueba_9_validacion_cita_duplicada(driver):
     print("\n[PRUEBA 9] Verificando rechazo de citas duplicadas...")
     
     driver.get("http://localhost:5000")
-    time.sleep(1)
+    cronometro.esperar(1)
     
     # Agendar primera cita
     driver.find_element(By.ID, "rut-paciente").send_keys("12345678-9")
@@ -277,7 +282,7 @@ def prueba_9_validacion_cita_duplicada(driver):
     driver.find_element(By.ID, "hora").send_keys("1500")
     Select(driver.find_element(By.ID, "tipo-consulta")).select_by_value("Control de rutina")
     driver.find_element(By.CSS_SELECTOR, "button[type='submit']").click()
-    time.sleep(2)
+    cronometro.esperar(2)
     
     # Intentar agendar cita duplicada
     driver.find_element(By.ID, "rut-paciente").clear()
@@ -307,27 +312,27 @@ def prueba_10_cancelar_cita(driver):
     print("\n[PRUEBA 10] Cancelando una cita...")
     
     driver.get("http://localhost:5000")
-    time.sleep(1)
+    cronometro.esperar(1)
     
     # Cambiar a tab de consultar
     tab_consultar = driver.find_elements(By.CLASS_NAME, "tab-button")[1]
     tab_consultar.click()
-    time.sleep(1)
+    cronometro.esperar(1)
     
     # Buscar citas
     boton_buscar = driver.find_element(By.XPATH, "//button[contains(text(), 'Buscar Citas')]")
     boton_buscar.click()
-    time.sleep(2)
+    cronometro.esperar(2)
     
     # Buscar botón de cancelar
     try:
         boton_cancelar = driver.find_element(By.CLASS_NAME, "btn-cancelar")
         boton_cancelar.click()
-        time.sleep(1)
+        cronometro.esperar(1)
         
         # Confirmar cancelación
         driver.switch_to.alert.accept()
-        time.sleep(2)
+        cronometro.esperar(2)
         
         print("   ✅ Cita cancelada exitosamente")
         print("   ✅ Funcionalidad de cancelación operativa")
@@ -347,10 +352,12 @@ def ejecutar_todas_las_pruebas():
     pruebas_fallidas = 0
     
     try:
-        driver = iniciar_driver()
+        with cronometro.paso('inicio_driver'):
+            driver = DriverCronometrado(iniciar_driver(), cronometro)
         
         # Limpiar estado antes de las pruebas
-        limpiar_citas(driver)
+        with cronometro.paso('limpiar_citas'):
+            limpiar_citas(driver)
         
         # Lista de pruebas
         pruebas = [
@@ -369,8 +376,13 @@ def ejecutar_todas_las_pruebas():
         # Ejecutar cada prueba
         for i, prueba in enumerate(pruebas, 1):
             try:
-                prueba(driver)
+                with cronometro.prueba(prueba.__name__, prueba.__doc__) as resultado:
+                    try:
+                        prueba(driver)
+                    finally:
+                        cronometro.capturar_timeline(driver)
                 pruebas_exitosas += 1
+                print(f"   ⏱️  {resultado['duracion_s']:.2f}s")
             except Exception as e:
                 pruebas_fallidas += 1
                 print(f"   ❌ Error en prueba {i}: {str(e)}")
@@ -383,6 +395,9 @@ def ejecutar_todas_las_pruebas():
         print(f"  ❌ Pruebas fallidas: {pruebas_fallidas}")
         print(f"  📊 Total de pruebas: {len(pruebas)}")
         print(f"  📈 Tasa de éxito: {(pruebas_exitosas/len(pruebas)*100):.1f}%")
+        print("  🐢 Pruebas más lentas:")
+        for resultado in cronometro.mas_lentas():
+            print(f"     {resultado['nombre']}: {resultado['duracion_s']:.2f}s")
         print("="*80)
         
     except Exception as e:
@@ -394,6 +409,9 @@ def ejecutar_todas_las_pruebas():
             time.sleep(3)
             driver.quit()
         
+        ruta_json, ruta_xml = cronometro.escribir_reportes()
+        print(f"📄 Reportes generados: {ruta_json}, {ruta_xml}")
+        
         print("\n✅ Pruebas en Firefox completadas\n")
 
 
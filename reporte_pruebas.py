@@ -0,0 +1,193 @@
+"""
+================================================================================
+    INSTRUMENTACIÓN Y REPORTES DE LAS PRUEBAS SELENIUM
+    Sistema: Consultas Oftalmológicas - Clínica "Visión Clara"
+    Propósito: Medir tiempos por prueba y por paso, capturar la línea de tiempo
+               del navegador y generar reportes JSON / JUnit
+================================================================================
+"""
+
+from contextlib import contextmanager
+from urllib.parse import urlparse
+import xml.etree.ElementTree as ET
+import json
+import os
+import time
+
+
+DIRECTORIO_REPORTES = os.getenv('REPORTES_DIR', 'reportes')
+
+# Entradas de navegación y llamadas fetch a /api/* registradas por el navegador.
+# Los recursos se borran tras leerlos para que una segunda captura de la misma
+# página no los repita; la navegación se identifica por su timeOrigin.
+SCRIPT_TIMELINE = """
+const redondear = v => Math.round(v * 1000) / 1000;
+const navegacion = performance.getEntriesByType('navigation').map(e => ({
+    tipo: 'navegacion',
+    url: e.name,
+    origen: performance.timeOrigin,
+    duracion_ms: redondear(e.duration),
+    ttfb_ms: redondear(e.responseStart - e.requestStart),
+    dom_listo_ms: redondear(e.domContentLoadedEventEnd),
+    carga_ms: redondear(e.loadEventEnd)
+}));
+const api = performance.getEntriesByType('resource')
+    .filter(e => e.initiatorType === 'fetch' && new URL(e.name).pathname.startsWith('/api/'))
+    .map(e => ({
+        tipo: 'fetch',
+        url: e.name,
+        inicio_ms: redondear(e.startTime),
+        duracion_ms: redondear(e.duration),
+        ttfb_ms: redondear(e.responseStart - e.requestStart)
+    }));
+performance.clearResourceTimings();
+return navegacion.concat(api);
+"""
+
+
+class CronometroPruebas:
+    """Registra tiempos por prueba y por paso (inicio del driver, carga de página, esperas)"""
+
+    def __init__(self, suite, navegador):
+        self.suite = suite
+        self.navegador = navegador
+        self.inicio = time.time()
+        self.pasos_suite = []
+        self.resultados = []
+        self._actual = None
+        self._navegaciones = set()  # (url, timeOrigin) ya capturadas
+
+    @contextmanager
+    def paso(self, nombre):
+        """Mide un paso; se asocia a la prueba en curso o a la suite si no hay ninguna"""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            destino = self._actual['pasos'] if self._actual else self.pasos_suite
+            destino.append({'paso': nombre, 'duracion_s': round(time.perf_counter() - inicio, 4)})
+
+    def esperar(self, segundos):
+        """Reemplazo de time.sleep que contabiliza el tiempo como espera"""
+        with self.paso('espera'):
+            time.sleep(segundos)
+
+    @contextmanager
+    def prueba(self, nombre, descripcion=None):
+        """Mide una prueba completa y registra su resultado (las excepciones se propagan)"""
+        self._actual = {
+            'nombre': nombre,
+            'descripcion': (descripcion or '').strip(),
+            'estado': 'exitosa',
+            'error': None,
+            'pasos': [],
+            'timeline': [],
+        }
+        inicio = time.perf_counter()
+        try:
+            yield self._actual
+        except Exception as e:
+            self._actual['estado'] = 'fallida'
+            self._actual['error'] = str(e) or e.__class__.__name__
+            raise
+        finally:
+            self._actual['duracion_s'] = round(time.perf_counter() - inicio, 4)
+            self.resultados.append(self._actual)
+            self._actual = None
+
+    def capturar_timeline(self, driver):
+        """Guarda en la prueba en curso las entradas de rendimiento de la página actual"""
+        if self._actual is None:
+            return
+        try:
+            if urlparse(driver.current_url).path.startswith('/api/'):
+                return
+            entradas = driver.execute_script(SCRIPT_TIMELINE) or []
+        except Exception:
+            return
+        for entrada in entradas:
+            if entrada['tipo'] == 'navegacion':
+                clave = (entrada['url'], entrada.get('origen'))
+                if clave in self._navegaciones:
+                    continue
+                self._navegaciones.add(clave)
+            self._actual['timeline'].append(entrada)
+
+    def resumen_endpoints(self):
+        """Agrega las llamadas fetch de todas las pruebas por endpoint /api/*"""
+        por_endpoint = {}
+        for resultado in self.resultados:
+            for entrada in resultado['timeline']:
+                if entrada['tipo'] != 'fetch':
+                    continue
+                ruta = urlparse(entrada['url']).path
+                por_endpoint.setdefault(ruta, []).append(entrada['duracion_ms'])
+        return {
+            ruta: {
+                'llamadas': len(duraciones),
+                'media_ms': round(sum(duraciones) / len(duraciones), 3),
+                'max_ms': round(max(duraciones), 3),
+            }
+            for ruta, duraciones in sorted(por_endpoint.items())
+        }
+
+    def mas_lentas(self, n=3):
+        return sorted(self.resultados, key=lambda r: r['duracion_s'], reverse=True)[:n]
+
+    def reporte(self):
+        return {
+            'suite': self.suite,
+            'navegador': self.navegador,
+            'inicio': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.inicio)),
+            'duracion_s': round(time.time() - self.inicio, 3),
+            'pasos_suite': self.pasos_suite,
+            'pruebas': self.resultados,
+            'endpoints': self.resumen_endpoints(),
+        }
+
+    def escribir_reportes(self, directorio=DIRECTORIO_REPORTES):
+        """Escribe el reporte JSON y el XML JUnit; devuelve las rutas generadas"""
+        os.makedirs(directorio, exist_ok=True)
+        base = os.path.join(directorio, f"pruebas-{self.navegador.lower()}")
+
+        with open(base + ".json", 'w', encoding='utf-8') as f:
+            json.dump(self.reporte(), f, indent=2, ensure_ascii=False)
+
+        fallidas = [r for r in self.resultados if r['estado'] == 'fallida']
+        suite = ET.Element('testsuite', {
+            'name': self.suite,
+            'tests': str(len(self.resultados)),
+            'failures': str(len(fallidas)),
+            'errors': '0',
+            'time': f"{sum(r['duracion_s'] for r in self.resultados):.4f}",
+        })
+        for resultado in self.resultados:
+            caso = ET.SubElement(suite, 'testcase', {
+                'classname': f"{self.suite}.{self.navegador}",
+                'name': resultado['nombre'],
+                'time': f"{resultado['duracion_s']:.4f}",
+            })
+            if resultado['estado'] == 'fallida':
+                ET.SubElement(caso, 'failure', {'message': resultado['error']}).text = resultado['error']
+            pasos = "\n".join(f"{p['paso']}: {p['duracion_s']:.4f}s" for p in resultado['pasos'])
+            ET.SubElement(caso, 'system-out').text = pasos
+        ET.ElementTree(suite).write(base + ".xml", encoding='utf-8', xml_declaration=True)
+
+        return base + ".json", base + ".xml"
+
+
+class DriverCronometrado:
+    """Envoltorio del WebDriver que mide cada carga de página y captura su línea de tiempo"""
+
+    def __init__(self, driver, cronometro):
+        self._driver = driver
+        self._cronometro = cronometro
+
+    def get(self, url):
+        # Antes de navegar, guardar las métricas de la página que se abandona
+        self._cronometro.capturar_timeline(self._driver)
+        with self._cronometro.paso('carga_pagina'):
+            self._driver.get(url)
+
+    def __getattr__(self, nombre):
+        return getattr(self._driver, nombre)
@@ -0,0 +1,129 @@
+"""
+================================================================================
+    ARRANQUE DEL SERVIDOR PARA PRUEBAS
+    Sistema: Consultas Oftalmológicas - Clínica "Visión Clara"
+    Propósito: Levantar la app (en proceso o como subproceso) y esperar a que
+               /api/salud responda, en lugar de dormir un tiempo fijo
+================================================================================
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+
+
+def esperar_disponible(url_base, timeout=30.0, intervalo=0.05, proceso=None):
+    """
+    Consulta /api/salud hasta obtener 200 y devuelve los segundos esperados.
+
+    Si se entrega `proceso` y este termina antes de estar listo, falla de inmediato.
+    """
+    url = url_base.rstrip('/') + "/api/salud"
+    inicio = time.perf_counter()
+    limite = inicio + timeout
+    while True:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as respuesta:
+                if respuesta.status == 200:
+                    return time.perf_counter() - inicio
+        except (urllib.error.URLError, OSError):
+            pass
+        if proceso is not None and proceso.poll() is not None:
+            raise RuntimeError(f"El servidor terminó con código {proceso.returncode} antes de estar listo")
+        if time.perf_counter() >= limite:
+            raise TimeoutError(f"El servidor no respondió en {url} tras {timeout} s")
+        time.sleep(intervalo)
+
+
+class ServidorEnProceso:
+    """Levanta la app Flask en un hilo del proceso actual (ideal para benchmarks y pruebas)"""
+
+    def __init__(self, host='127.0.0.1', puerto=0):
+        from werkzeug.serving import make_server
+        from sistema_consultas import app
+
+        self._servidor = make_server(host, puerto, app, threaded=True)
+        self.url = f"http://{host}:{self._servidor.server_port}"
+        self._hilo = threading.Thread(target=self._servidor.serve_forever, daemon=True)
+
+    def iniciar(self, timeout=10.0):
+        self._hilo.start()
+        esperar_disponible(self.url, timeout)
+        return self
+
+    def detener(self):
+        self._servidor.shutdown()
+        self._hilo.join()
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *exc):
+        self.detener()
+
+
+class ServidorSubproceso:
+    """Levanta `sistema_consultas.py` como subproceso, sin depurador ni recargador"""
+
+    def __init__(self, puerto=5000, host='127.0.0.1', log=None):
+        self.puerto = puerto
+        self.url = f"http://{host}:{puerto}"
+        self._host = host
+        self._log = log
+        self.proceso = None
+
+    def iniciar(self, timeout=30.0):
+        entorno = dict(os.environ, PUERTO=str(self.puerto), HOST=self._host, FLASK_DEBUG='0')
+        salida = open(self._log, 'w') if self._log else subprocess.DEVNULL
+        self.proceso = subprocess.Popen(
+            [sys.executable, os.path.join(DIRECTORIO, "sistema_consultas.py")],
+            cwd=DIRECTORIO, env=entorno, stdout=salida, stderr=subprocess.STDOUT
+        )
+        try:
+            esperar_disponible(self.url, timeout, proceso=self.proceso)
+        except Exception:
+            self.detener()
+            raise
+        return self
+
+    def detener(self, timeout=5.0):
+        if self.proceso and self.proceso.poll() is None:
+            self.proceso.terminate()
+            try:
+                self.proceso.wait(timeout)
+            except subprocess.TimeoutExpired:
+                self.proceso.kill()
+                self.proceso.wait()
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *exc):
+        self.detener()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Espera a que el servidor de consultas esté listo")
+    parser.add_argument('--url', default="http://localhost:5000", help="URL base del servidor")
+    parser.add_argument('--timeout', type=float, default=30.0, help="Segundos máximos de espera")
+    args = parser.parse_args(argv)
+
+    try:
+        segundos = esperar_disponible(args.url, args.timeout)
+    except TimeoutError as e:
+        print(f"❌ {e}")
+        return 1
+    print(f"✅ Servidor listo en {args.url} ({segundos:.2f} s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
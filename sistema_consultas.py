@@ -6,14 +6,88 @@
 ================================================================================
 """
 
-from flask import Flask, render_template, request, jsonify
-from datetime import datetime, timedelta
+from flask import Flask, Response, render_template, request, jsonify, abort, g, has_request_context
+from bisect import bisect_left, insort
+from functools import wraps
+import gzip
+import hashlib
+import hmac
+import heapq
 import json
+import math
+import mimetypes
+import os
+import time
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional: sin él solo se ofrece gzip
+    brotli = None
+
+from auditoria import RegistroAuditoria
+from eventos import BusEventos
+from generar_datos import generar_escenario
+from horarios import DIA_MAXIMO, fecha_iso, hora_texto, parsear_fecha, parsear_hora, reloj, slot
+from idempotencia import CacheIdempotencia, CuerpoDistinto, EnCurso
+from limitador import ControlAdmision, LimitadorTasa, Saturado
+from lista_espera import ListaEspera
+from perfilador import Perfilador
 
 app = Flask(__name__)
+app.config['LIMITE_TASA_ACTIVO'] = os.getenv('LIMITE_TASA', '1') != '0'
+app.config['PERFILADO_ACTIVO'] = os.getenv('PERFILADO', '0') == '1'
+app.config['ADMIN_TOKEN'] = os.getenv('ADMIN_TOKEN')
+app.config['SEMBRADO_ACTIVO'] = os.getenv('SEMBRADO', '0') == '1'
+bus_eventos = BusEventos()
+auditoria = RegistroAuditoria()
+
+# Perfiles de peticiones lentas (solo con PERFILADO=1); X-Perfilar: 1 fuerza cProfile.
+# Se consultan en /api/admin/perfiles, que exige ADMIN_TOKEN.
+perfilador = Perfilador(
+    umbral_ms=float(os.getenv('PERFILADO_UMBRAL_MS', '500')),
+    tasa_muestreo=float(os.getenv('PERFILADO_TASA', '0')),
+    max_perfiles=int(os.getenv('PERFILADO_MAX', '20'))
+)
+
+def auditar(accion, **datos):
+    """Deja traza de una modificación (solo encola; la escritura es asíncrona)"""
+    if has_request_context():
+        datos['ip'] = request.remote_addr
+    auditoria.registrar(accion, **datos)
+
+
+# Límites para endpoints que modifican datos
+limitador_ip = LimitadorTasa(capacidad=30, recarga_por_segundo=10)
+limitador_rut = LimitadorTasa(capacidad=5, recarga_por_segundo=0.5)
+admision = ControlAdmision(max_concurrentes=8, max_en_cola=32, espera_max=2.0)
+
+# Respuestas de /api/agendar por Idempotency-Key (24 h, máximo 10.000 claves)
+cache_idempotencia = CacheIdempotencia(ttl=86400, max_entradas=10_000)
 
 # Almacenamiento en memoria (simulación)
 citas = []
+
+# Índices de horarios ocupados -> id de cita, para detectar conflictos sin recorrer `citas`.
+# El horario se normaliza a (día ordinal, minuto del día): "9:00" y "09:00" son el mismo.
+horarios_doctor = {}    # (doctor_id, dia, minuto)
+horarios_paciente = {}  # (rut_paciente, dia, minuto)
+
+# Agenda ordenada por doctor: doctor_id -> lista de (dia, minuto, id_cita) para consultas por rango
+agendas_doctor = {}
+
+# Rango máximo (en días) de una consulta de agenda
+MAX_DIAS_AGENDA = 92
+
+# Pacientes en espera de un cupo por doctor y rango de fechas
+lista_espera = ListaEspera(hoy=reloj.hoy)
+MAX_DIAS_ESPERA = 60
+
+# Máximo de citas que puede generar una serie recurrente
+MAX_OCURRENCIAS_SERIE = 104
+
+# Máximos por llamada a /api/sembrar (solo disponible con SEMBRADO=1)
+MAX_SEMBRADO = {'pacientes': 200_000, 'doctores': 1_000, 'citas': 500_000}
+
 pacientes = {
     "12345678-9": {
         "rut": "12345678-9",
@@ -57,11 +131,163 @@ doctores = [
     {"id": 3, "nombre": "Dra. Patricia Rojas", "especialidad": "Retina y Vítreo"}
 ]
 
+# Fragmentos JSON pre-serializados (se invalidan cuando cambian los datos de origen)
+cache_json = {}
+
+
+def doctores_json():
+    """Lista de doctores serializada una sola vez hasta que el roster cambie"""
+    if 'doctores' not in cache_json:
+        cache_json['doctores'] = app.json.dumps(doctores)
+    return cache_json['doctores']
+
+
+# Compresión y assets estáticos
+UMBRAL_COMPRESION = 1024  # bytes; respuestas menores no se comprimen
+CACHE_ASSETS = 'public, max-age=31536000, immutable'
+cache_paginas = {}
+
+
+def comprimir(cuerpo, codificacion, nivel=6):
+    """Comprime un cuerpo en bytes con la codificación indicada"""
+    if codificacion == 'br':
+        return brotli.compress(cuerpo, quality=min(nivel, 11))
+    return gzip.compress(cuerpo, compresslevel=nivel, mtime=0)
+
+
+def codificaciones_aceptadas():
+    """Codificaciones soportadas que acepta el cliente, en orden de preferencia"""
+    aceptadas = set()
+    for parte in request.headers.get('Accept-Encoding', '').split(','):
+        nombre, _, parametros = parte.strip().partition(';')
+        if parametros.strip().replace(' ', '') in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            continue
+        aceptadas.add(nombre.strip().lower())
+    preferidas = ['br', 'gzip'] if brotli else ['gzip']
+    return [c for c in preferidas if c in aceptadas]
+
+
+def variantes_comprimidas(cuerpo):
+    """Cuerpo original más sus versiones gzip/brotli (para contenido que se cachea)"""
+    variantes = {'identity': cuerpo, 'gzip': comprimir(cuerpo, 'gzip', 9)}
+    if brotli:
+        variantes['br'] = comprimir(cuerpo, 'br', 11)
+    return variantes
+
+
+def respuesta_negociada(variantes, mimetype, cache_control, etag):
+    """Entrega la mejor variante pre-comprimida según Accept-Encoding"""
+    codificacion = next((c for c in codificaciones_aceptadas() if c in variantes), 'identity')
+    respuesta = app.response_class(variantes[codificacion], mimetype=mimetype)
+    if codificacion != 'identity':
+        respuesta.headers['Content-Encoding'] = codificacion
+    respuesta.headers['Vary'] = 'Accept-Encoding'
+    respuesta.headers['Cache-Control'] = cache_control
+    respuesta.set_etag(f"{etag}-{codificacion}")
+    return respuesta.make_conditional(request)
+
+
+def construir_assets():
+    """Indexa static/ con nombres que incluyen el hash del contenido"""
+    manifiesto = {}
+    archivos = {}
+    for raiz, _, nombres in os.walk(app.static_folder):
+        for nombre in nombres:
+            ruta = os.path.join(raiz, nombre)
+            with open(ruta, 'rb') as f:
+                contenido = f.read()
+            logica = os.path.relpath(ruta, app.static_folder).replace(os.sep, '/')
+            base, extension = os.path.splitext(logica)
+            huella = hashlib.sha256(contenido).hexdigest()[:12]
+            con_hash = f"{base}.{huella}{extension}"
+            manifiesto[logica] = con_hash
+            archivos[con_hash] = {
+                'mimetype': mimetypes.guess_type(nombre)[0] or 'application/octet-stream',
+                'huella': huella,
+                'variantes': variantes_comprimidas(contenido)
+            }
+    return manifiesto, archivos
+
+
+manifiesto_assets, archivos_assets = construir_assets()
+
+
+def url_asset(ruta):
+    """URL con hash de contenido para un archivo de static/"""
+    return '/assets/' + manifiesto_assets[ruta]
+
+
+@app.route('/assets/<path:nombre>')
+def servir_asset(nombre):
+    """Assets estáticos con nombre versionado: cacheables indefinidamente"""
+    asset = archivos_assets.get(nombre)
+    if asset is None:
+        abort(404)
+    return respuesta_negociada(asset['variantes'], asset['mimetype'], CACHE_ASSETS, asset['huella'])
+
+
+@app.before_request
+def iniciar_perfilado():
+    """Empieza a medir la petición si el perfilado está activo"""
+    if not app.config['PERFILADO_ACTIVO']:
+        return
+    # Patrón de la ruta y no la URL, para no guardar RUTs en los perfiles
+    ruta = request.url_rule.rule if request.url_rule else request.path
+    if ruta.startswith('/api/admin/'):
+        return
+    g.perfil = perfilador.comenzar(ruta, request.method, forzado=request.headers.get('X-Perfilar') == '1')
+
+
+# Registrado antes que comprimir_json para que la medición incluya la compresión
+@app.after_request
+def terminar_perfilado(respuesta):
+    estado = g.pop('perfil', None)
+    if estado is not None:
+        registro = perfilador.terminar(estado, respuesta.status_code)
+        if registro is not None:
+            respuesta.headers['X-Perfil-Id'] = str(registro['id'])
+    return respuesta
+
+
+@app.teardown_request
+def descartar_perfilado(error=None):
+    """Cierra la medición si la petición terminó con una excepción"""
+    estado = g.pop('perfil', None)
+    if estado is not None:
+        perfilador.terminar(estado, 500)
+
+
+@app.after_request
+def comprimir_json(respuesta):
+    """Comprime respuestas JSON grandes (ej. /api/citas) si el cliente lo acepta"""
+    if (respuesta.mimetype != 'application/json'
+            or respuesta.direct_passthrough
+            or respuesta.is_streamed
+            or 'Content-Encoding' in respuesta.headers
+            or respuesta.content_length is None
+            or respuesta.content_length < UMBRAL_COMPRESION):
+        return respuesta
+    
+    codificaciones = codificaciones_aceptadas()
+    respuesta.headers.add('Vary', 'Accept-Encoding')
+    if codificaciones:
+        # Nivel moderado: el contenido es dinámico y se comprime en cada petición
+        respuesta.set_data(comprimir(respuesta.get_data(), codificaciones[0], 5))
+        respuesta.headers['Content-Encoding'] = codificaciones[0]
+    return respuesta
+
 
 @app.route('/')
 def index():
-    """Página principal del sistema"""
-    return render_template('index.html')
+    """Página principal del sistema (renderizada una vez y servida comprimida)"""
+    if 'index' not in cache_paginas or app.debug:
+        html = render_template('index.html', url_asset=url_asset).encode('utf-8')
+        cache_paginas['index'] = {
+            'variantes': variantes_comprimidas(html),
+            'huella': hashlib.sha256(html).hexdigest()[:12]
+        }
+    pagina = cache_paginas['index']
+    return respuesta_negociada(pagina['variantes'], 'text/html', 'no-cache', pagina['huella'])
 
 
 @app.route('/api/paciente/<rut>', methods=['GET'])
@@ -76,7 +302,7 @@ def obtener_paciente(rut):
 @app.route('/api/doctores', methods=['GET'])
 def obtener_doctores():
     """API: Obtiene lista de doctores disponibles"""
-    return jsonify(doctores)
+    return app.response_class(doctores_json(), mimetype='application/json')
 
 
 @app.route('/api/citas', methods=['GET'])
@@ -88,11 +314,107 @@ def obtener_citas():
 @app.route('/api/citas/<rut>', methods=['GET'])
 def obtener_citas_paciente(rut):
     """API: Obtiene citas de un paciente específico"""
-    citas_paciente = [c for c in citas if c['rut_paciente'] == rut]
-    return jsonify(citas_paciente)
+    return jsonify(citas_de_paciente(rut))
+
+
+def citas_de_paciente(rut):
+    """Citas asociadas a un RUT"""
+    return [c for c in citas if c['rut_paciente'] == rut]
+
+
+def resumen_citas(citas_paciente):
+    """Totales por estado y próxima cita agendada de un paciente"""
+    agendadas = [c for c in citas_paciente if c['estado'] == 'Agendada']
+    proxima = min(agendadas, key=lambda c: slot(c['fecha'], c['hora']), default=None)
+    return {
+        'total': len(citas_paciente),
+        'agendadas': len(agendadas),
+        'canceladas': len(citas_paciente) - len(agendadas),
+        'proxima_cita': proxima
+    }
+
+
+def rechazar_exceso(mensaje, espera):
+    """Respuesta 429 inmediata con Retry-After"""
+    respuesta = jsonify({'error': mensaje})
+    respuesta.status_code = 429
+    respuesta.headers['Retry-After'] = str(max(1, math.ceil(espera)))
+    return respuesta
+
+
+def limitar_tasa(vista):
+    """Aplica token bucket por IP y por RUT, y control de admisión, a una vista"""
+    @wraps(vista)
+    def envoltura(*args, **kwargs):
+        if not app.config['LIMITE_TASA_ACTIVO']:
+            return vista(*args, **kwargs)
+        
+        permitido, espera = limitador_ip.permitir(request.remote_addr)
+        if not permitido:
+            return rechazar_exceso('Demasiadas solicitudes desde esta dirección, intente más tarde', espera)
+        
+        data = request.get_json(silent=True)
+        rut = data.get('rut_paciente') if isinstance(data, dict) else None
+        if rut:
+            permitido, espera = limitador_rut.permitir(str(rut))
+            if not permitido:
+                return rechazar_exceso('Demasiadas solicitudes para este paciente, intente más tarde', espera)
+        
+        try:
+            admision.entrar()
+        except Saturado:
+            return rechazar_exceso('Servidor ocupado, intente nuevamente', 1)
+        try:
+            return vista(*args, **kwargs)
+        finally:
+            admision.salir()
+    return envoltura
+
+
+def idempotente(vista):
+    """
+    Soporte de cabecera Idempotency-Key: un reintento con la misma clave y el
+    mismo cuerpo recibe la respuesta exitosa original sin repetir validaciones.
+    """
+    @wraps(vista)
+    def envoltura(*args, **kwargs):
+        clave = request.headers.get('Idempotency-Key')
+        if not clave:
+            return vista(*args, **kwargs)
+        if len(clave) > 255:
+            return jsonify({'error': 'Idempotency-Key demasiado larga (máximo 255 caracteres)'}), 400
+        
+        huella = hashlib.sha256(request.get_data()).hexdigest()
+        try:
+            guardada = cache_idempotencia.reservar(clave, huella)
+        except CuerpoDistinto:
+            return jsonify({'error': 'Idempotency-Key ya utilizada con otros datos'}), 422
+        except EnCurso:
+            return jsonify({'error': 'La solicitud original aún está en proceso'}), 409
+        
+        if guardada is not None:
+            cuerpo, status, mimetype = guardada
+            respuesta = app.response_class(cuerpo, status=status, mimetype=mimetype)
+            respuesta.headers['Idempotent-Replayed'] = 'true'
+            return respuesta
+        
+        respuesta = None
+        try:
+            respuesta = app.make_response(vista(*args, **kwargs))
+            return respuesta
+        finally:
+            # Solo se recuerdan las respuestas exitosas; un error puede reintentarse
+            if respuesta is not None and respuesta.status_code == 200:
+                cache_idempotencia.completar(
+                    clave, (respuesta.get_data(), respuesta.status_code, respuesta.mimetype))
+            else:
+                cache_idempotencia.liberar(clave)
+    return envoltura
 
 
 @app.route('/api/agendar', methods=['POST'])
+@limitar_tasa
+@idempotente
 def agendar_cita():
     """API: Agenda una nueva cita oftalmológica"""
     data = request.json
@@ -114,90 +436,593 @@ def agendar_cita():
     
     # Validación 4: Fecha debe ser futura
     try:
-        fecha_cita = datetime.strptime(data['fecha'], '%Y-%m-%d')
-        if fecha_cita.date() < datetime.now().date():
-            return jsonify({'error': 'La fecha de la cita debe ser futura'}), 400
+        dia = parsear_fecha(data['fecha'])
     except ValueError:
         return jsonify({'error': 'Formato de fecha inválido (usar YYYY-MM-DD)'}), 400
+    if dia < reloj.hoy():
+        return jsonify({'error': 'La fecha de la cita debe ser futura'}), 400
+    try:
+        minuto = parsear_hora(data['hora'])
+    except ValueError:
+        return jsonify({'error': 'Formato de hora inválido (usar HH:MM)'}), 400
     
     # Validación 5: No permitir citas duplicadas (mismo paciente, fecha, hora)
-    for cita in citas:
-        if (cita['rut_paciente'] == data['rut_paciente'] and 
-            cita['fecha'] == data['fecha'] and 
-            cita['hora'] == data['hora']):
-            return jsonify({'error': 'Ya existe una cita para este paciente en esta fecha y hora'}), 400
+    if (data['rut_paciente'], dia, minuto) in horarios_paciente:
+        return jsonify({'error': 'Ya existe una cita para este paciente en esta fecha y hora'}), 400
     
     # Validación 6: No permitir doble reserva del mismo doctor
-    for cita in citas:
-        if (cita['doctor_id'] == int(data['doctor_id']) and 
-            cita['fecha'] == data['fecha'] and 
-            cita['hora'] == data['hora']):
-            return jsonify({'error': 'El doctor ya tiene una cita agendada en este horario'}), 400
-    
-    # Crear nueva cita
-    paciente = pacientes[data['rut_paciente']]
+    if (doctor['id'], dia, minuto) in horarios_doctor:
+        return jsonify({'error': 'El doctor ya tiene una cita agendada en este horario'}), 400
+    
+    # Crear nueva cita (fecha y hora se guardan en formato canónico)
+    nueva_cita = crear_cita(pacientes[data['rut_paciente']], doctor, fecha_iso(dia), hora_texto(minuto),
+                            data['tipo_consulta'], reloj.marca())
+    
+    return jsonify({
+        'success': True,
+        'mensaje': 'Cita agendada exitosamente',
+        'cita': nueva_cita
+    })
+
+
+def crear_cita(paciente, doctor, fecha, hora, tipo_consulta, fecha_creacion, **extra):
+    """Registra una cita ya validada, la indexa y notifica a las interfaces abiertas"""
     nueva_cita = {
         'id': len(citas) + 1,
-        'rut_paciente': data['rut_paciente'],
+        'rut_paciente': paciente['rut'],
         'nombre_paciente': paciente['nombre'],
-        'doctor_id': int(data['doctor_id']),
+        'doctor_id': doctor['id'],
         'nombre_doctor': doctor['nombre'],
-        'fecha': data['fecha'],
-        'hora': data['hora'],
-        'tipo_consulta': data['tipo_consulta'],
+        'fecha': fecha,
+        'hora': hora,
+        'tipo_consulta': tipo_consulta,
         'estado': 'Agendada',
-        'fecha_creacion': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        'fecha_creacion': fecha_creacion,
+        **extra
     }
     
     citas.append(nueva_cita)
+    indexar_cita(nueva_cita)
+    bus_eventos.publicar('cita_agendada', nueva_cita)
+    auditar('cita_agendada', cita_id=nueva_cita['id'], rut_paciente=nueva_cita['rut_paciente'],
+            doctor_id=nueva_cita['doctor_id'], fecha_cita=fecha, hora_cita=hora, **extra)
+    return nueva_cita
+
+
+def indexar_cita(cita, ordenar=True):
+    """
+    Marca como ocupados los horarios del doctor y del paciente de una cita y la
+    agrega a la agenda del doctor (con ordenar=False se agrega al final y el
+    llamador debe ordenar la agenda después, útil en cargas masivas).
+    """
+    dia, minuto = slot(cita['fecha'], cita['hora'])
+    horarios_doctor[(cita['doctor_id'], dia, minuto)] = cita['id']
+    horarios_paciente[(cita['rut_paciente'], dia, minuto)] = cita['id']
+    agenda = agendas_doctor.setdefault(cita['doctor_id'], [])
+    if ordenar:
+        insort(agenda, (dia, minuto, cita['id']))
+    else:
+        agenda.append((dia, minuto, cita['id']))
+
+
+def cita_por_id(cita_id):
+    """Cita por id en O(1): los ids son correlativos a la posición en `citas`"""
+    if 1 <= cita_id <= len(citas) and citas[cita_id - 1]['id'] == cita_id:
+        return citas[cita_id - 1]
+    return next((c for c in citas if c['id'] == cita_id), None)
+
+
+def agenda_rango(doctor_id, dia_desde, dia_hasta):
+    """Entradas (dia, minuto, id) de un doctor entre dos días inclusive, en O(log n + k)"""
+    agenda = agendas_doctor.get(doctor_id, [])
+    inicio = bisect_left(agenda, (dia_desde,))
+    fin = bisect_left(agenda, (dia_hasta + 1,), inicio)
+    return agenda[inicio:fin]
+
+
+def expandir_serie(dia_inicio, regla):
+    """
+    Días (ordinales) de una serie recurrente. La regla indica frecuencia ('dias' o
+    'semanas'), intervalo y el fin de la serie: 'cantidad' o 'hasta' (YYYY-MM-DD).
+    """
+    frecuencia = regla.get('frecuencia', 'semanas')
+    if frecuencia not in ('dias', 'semanas'):
+        raise ValueError("Frecuencia inválida (usar 'dias' o 'semanas')")
+    try:
+        intervalo = int(regla.get('intervalo', 1))
+    except (TypeError, ValueError):
+        raise ValueError('Intervalo inválido')
+    if intervalo < 1:
+        raise ValueError('El intervalo debe ser mayor o igual a 1')
+    paso = intervalo * (7 if frecuencia == 'semanas' else 1)
+    
+    if regla.get('cantidad'):
+        try:
+            cantidad = int(regla['cantidad'])
+        except (TypeError, ValueError):
+            raise ValueError('Cantidad inválida')
+    elif regla.get('hasta'):
+        try:
+            hasta = parsear_fecha(regla['hasta'])
+        except ValueError:
+            raise ValueError('Formato de fecha "hasta" inválido (usar YYYY-MM-DD)')
+        if hasta < dia_inicio:
+            raise ValueError('La fecha "hasta" debe ser posterior al inicio de la serie')
+        cantidad = (hasta - dia_inicio) // paso + 1
+    else:
+        raise ValueError('La regla debe indicar "cantidad" o "hasta"')
+    
+    if cantidad < 1 or cantidad > MAX_OCURRENCIAS_SERIE:
+        raise ValueError(f'La serie debe tener entre 1 y {MAX_OCURRENCIAS_SERIE} citas')
+    # Se valida la última fecha antes de agendar nada: la serie es todo o nada
+    if dia_inicio + paso * (cantidad - 1) > DIA_MAXIMO:
+        raise ValueError('La serie excede la fecha máxima permitida')
+    return [dia_inicio + paso * i for i in range(cantidad)]
+
+
+@app.route('/api/agendar/serie', methods=['POST'])
+@limitar_tasa
+@idempotente
+def agendar_serie():
+    """
+    API: Agenda una serie de citas recurrentes (ej. controles semanales).
+
+    Todas las ocurrencias se verifican en bloque contra los índices de horarios;
+    si alguna choca no se agenda ninguna y se informan todas las fechas en conflicto.
+    """
+    data = request.get_json(silent=True) or {}
+    
+    campos_requeridos = ['rut_paciente', 'doctor_id', 'fecha_inicio', 'hora', 'tipo_consulta', 'regla']
+    for campo in campos_requeridos:
+        if campo not in data or not data[campo]:
+            return jsonify({'error': f'Campo requerido: {campo}'}), 400
+    
+    if data['rut_paciente'] not in pacientes:
+        return jsonify({'error': 'Paciente no registrado en el sistema'}), 400
+    
+    try:
+        doctor_id = int(data['doctor_id'])
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Doctor no encontrado'}), 400
+    doctor = next((d for d in doctores if d['id'] == doctor_id), None)
+    if not doctor:
+        return jsonify({'error': 'Doctor no encontrado'}), 400
+    
+    try:
+        dia_inicio = parsear_fecha(data['fecha_inicio'])
+    except ValueError:
+        return jsonify({'error': 'Formato de fecha inválido (usar YYYY-MM-DD)'}), 400
+    if dia_inicio < reloj.hoy():
+        return jsonify({'error': 'La fecha de la cita debe ser futura'}), 400
+    try:
+        minuto = parsear_hora(data['hora'])
+    except ValueError:
+        return jsonify({'error': 'Formato de hora inválido (usar HH:MM)'}), 400
+    
+    if not isinstance(data['regla'], dict):
+        return jsonify({'error': 'Regla de recurrencia inválida'}), 400
+    try:
+        dias = expandir_serie(dia_inicio, data['regla'])
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    # Verificación en bloque: intersección de conjuntos contra los índices
+    rut = data['rut_paciente']
+    choques_paciente = {(rut, d, minuto) for d in dias} & horarios_paciente.keys()
+    choques_doctor = {(doctor['id'], d, minuto) for d in dias} & horarios_doctor.keys()
+    if choques_paciente or choques_doctor:
+        conflictos = [(d, 'El paciente ya tiene una cita en este horario') for _, d, _ in choques_paciente]
+        conflictos += [(d, 'El doctor ya tiene una cita agendada en este horario') for _, d, _ in choques_doctor]
+        conflictos = [{'fecha': fecha_iso(d), 'motivo': motivo} for d, motivo in sorted(conflictos)]
+        return jsonify({
+            'error': f'La serie tiene {len({c["fecha"] for c in conflictos})} fecha(s) en conflicto',
+            'conflictos': conflictos
+        }), 400
+    
+    paciente = pacientes[rut]
+    serie_id = len(citas) + 1
+    hora = hora_texto(minuto)
+    nuevas = [crear_cita(paciente, doctor, fecha_iso(d), hora, data['tipo_consulta'], reloj.marca(),
+                         serie_id=serie_id)
+              for d in dias]
     
     return jsonify({
         'success': True,
-        'mensaje': 'Cita agendada exitosamente',
-        'cita': nueva_cita
+        'mensaje': f'Serie de {len(nuevas)} citas agendada exitosamente',
+        'citas': nuevas
     })
 
 
 @app.route('/api/cancelar/<int:cita_id>', methods=['POST'])
 def cancelar_cita(cita_id):
     """API: Cancela una cita existente"""
-    for cita in citas:
-        if cita['id'] == cita_id:
-            cita['estado'] = 'Cancelada'
-            return jsonify({
-                'success': True,
-                'mensaje': 'Cita cancelada exitosamente'
-            })
+    cita = cita_por_id(cita_id)
+    if cita is None:
+        return jsonify({'error': 'Cita no encontrada'}), 404
+    
+    reasignada = None
+    if cita['estado'] != 'Cancelada':
+        cita['estado'] = 'Cancelada'
+        dia, minuto = liberar_horario(cita)
+        bus_eventos.publicar('cita_cancelada', {
+            'id': cita_id, 'rut_paciente': cita['rut_paciente'], 'estado': 'Cancelada'
+        })
+        auditar('cita_cancelada', cita_id=cita_id, rut_paciente=cita['rut_paciente'],
+                doctor_id=cita['doctor_id'], fecha_cita=cita['fecha'], hora_cita=cita['hora'])
+        if (dia, minuto) > reloj.ahora():
+            # Un cupo que ya pasó (incluso más temprano hoy) no se ofrece a la lista de espera
+            reasignada = asignar_desde_espera(cita, dia, minuto)
+    
+    respuesta = {
+        'success': True,
+        'mensaje': 'Cita cancelada exitosamente'
+    }
+    if reasignada:
+        respuesta['reasignada'] = reasignada
+    return jsonify(respuesta)
+
+
+def liberar_horario(cita):
+    """Quita de los índices el horario de una cita cancelada; devuelve su (dia, minuto)"""
+    dia, minuto = slot(cita['fecha'], cita['hora'])
+    if horarios_doctor.get((cita['doctor_id'], dia, minuto)) == cita['id']:
+        del horarios_doctor[(cita['doctor_id'], dia, minuto)]
+    if horarios_paciente.get((cita['rut_paciente'], dia, minuto)) == cita['id']:
+        del horarios_paciente[(cita['rut_paciente'], dia, minuto)]
+    return dia, minuto
+
+
+def asignar_desde_espera(cita_cancelada, dia, minuto):
+    """Agenda el cupo liberado al primer paciente en espera que pueda tomarlo"""
+    doctor_id = cita_cancelada['doctor_id']
+    if (doctor_id, dia, minuto) in horarios_doctor:
+        return None
+    doctor = next((d for d in doctores if d['id'] == doctor_id), None)
+    
+    def disponible(solicitud):
+        return (solicitud['rut_paciente'], dia, minuto) not in horarios_paciente
+    
+    def reservar(solicitud):
+        nueva = crear_cita(pacientes[solicitud['rut_paciente']], doctor, cita_cancelada['fecha'],
+                           cita_cancelada['hora'], solicitud['tipo_consulta'], reloj.marca(),
+                           lista_espera_id=solicitud['id'])
+        return nueva['id']
+    
+    solicitud = lista_espera.asignar(doctor_id, dia, disponible, reservar)
+    if solicitud is None:
+        return None
+    return cita_por_id(solicitud['cita_id'])
+
+
+def solicitud_publica(solicitud):
+    """Solicitud de espera con fechas en texto"""
+    datos = {k: v for k, v in solicitud.items() if k not in ('dia_desde', 'dia_hasta')}
+    datos['desde'] = fecha_iso(solicitud['dia_desde'])
+    datos['hasta'] = fecha_iso(solicitud['dia_hasta'])
+    return datos
+
+
+@app.route('/api/lista-espera', methods=['POST'])
+@limitar_tasa
+def registrar_lista_espera():
+    """
+    API: Inscribe a un paciente en la lista de espera de un doctor para un rango
+    de fechas; si se cancela una cita en ese rango, se le agenda automáticamente.
+    """
+    data = request.get_json(silent=True) or {}
+    
+    campos_requeridos = ['rut_paciente', 'doctor_id', 'desde', 'hasta']
+    for campo in campos_requeridos:
+        if campo not in data or not data[campo]:
+            return jsonify({'error': f'Campo requerido: {campo}'}), 400
+    
+    if data['rut_paciente'] not in pacientes:
+        return jsonify({'error': 'Paciente no registrado en el sistema'}), 400
     
-    return jsonify({'error': 'Cita no encontrada'}), 404
+    try:
+        doctor_id = int(data['doctor_id'])
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Doctor no encontrado'}), 400
+    if not any(d['id'] == doctor_id for d in doctores):
+        return jsonify({'error': 'Doctor no encontrado'}), 400
+    
+    try:
+        dia_desde = parsear_fecha(data['desde'])
+        dia_hasta = parsear_fecha(data['hasta'])
+    except ValueError:
+        return jsonify({'error': 'Formato de fecha inválido (usar YYYY-MM-DD)'}), 400
+    if dia_desde < reloj.hoy():
+        return jsonify({'error': 'La fecha de la cita debe ser futura'}), 400
+    if dia_hasta < dia_desde:
+        return jsonify({'error': 'La fecha "hasta" debe ser posterior a "desde"'}), 400
+    if dia_hasta - dia_desde >= MAX_DIAS_ESPERA:
+        return jsonify({'error': f'El rango máximo es de {MAX_DIAS_ESPERA} días'}), 400
+    
+    try:
+        prioridad = int(data.get('prioridad', 0))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Prioridad inválida'}), 400
+    
+    solicitud = lista_espera.registrar(
+        data['rut_paciente'], doctor_id, dia_desde, dia_hasta, prioridad,
+        tipo_consulta=data.get('tipo_consulta') or 'Control de rutina',
+        fecha_creacion=reloj.marca()
+    )
+    auditar('espera_registrada', solicitud_id=solicitud['id'], rut_paciente=solicitud['rut_paciente'],
+            doctor_id=doctor_id, desde=data['desde'], hasta=data['hasta'])
+    return jsonify({
+        'success': True,
+        'mensaje': 'Paciente agregado a la lista de espera',
+        'solicitud': solicitud_publica(solicitud)
+    })
+
+
+@app.route('/api/lista-espera', methods=['GET'])
+def consultar_lista_espera():
+    """API: Solicitudes pendientes en lista de espera (opcional: ?doctor_id=)"""
+    doctor_id = request.args.get('doctor_id', type=int)
+    return jsonify([solicitud_publica(s) for s in lista_espera.pendientes(doctor_id)])
+
+
+@app.route('/api/lista-espera/<int:solicitud_id>/cancelar', methods=['POST'])
+def cancelar_lista_espera(solicitud_id):
+    """API: Retira a un paciente de la lista de espera"""
+    solicitud = lista_espera.cancelar(solicitud_id)
+    if solicitud is None:
+        return jsonify({'error': 'Solicitud pendiente no encontrada'}), 404
+    auditar('espera_cancelada', solicitud_id=solicitud_id, rut_paciente=solicitud['rut_paciente'])
+    return jsonify({'success': True, 'mensaje': 'Solicitud de espera cancelada'})
+
+
+@app.route('/api/agenda', methods=['GET'])
+def consultar_agenda():
+    """
+    API: Agenda de un doctor o de toda la clínica.
+
+    Parámetros: fecha (por defecto hoy) y vista 'dia' o 'semana' (lunes a
+    domingo), o bien desde/hasta; doctor_id opcional; incluir_canceladas=1.
+    """
+    try:
+        if request.args.get('desde') or request.args.get('hasta'):
+            dia_desde = parsear_fecha(request.args.get('desde', ''))
+            dia_hasta = parsear_fecha(request.args.get('hasta', ''))
+        else:
+            fecha = request.args.get('fecha')
+            dia_desde = parsear_fecha(fecha) if fecha else reloj.hoy()
+            dia_hasta = dia_desde
+            vista = request.args.get('vista', 'dia')
+            if vista == 'semana':
+                dia_desde -= (dia_desde - 1) % 7  # el día ordinal 1 (01-01-0001) fue lunes
+                dia_hasta = min(dia_desde + 6, DIA_MAXIMO)
+            elif vista != 'dia':
+                return jsonify({'error': "Vista inválida (usar 'dia' o 'semana')"}), 400
+    except ValueError:
+        return jsonify({'error': 'Formato de fecha inválido (usar YYYY-MM-DD)'}), 400
+    
+    if dia_hasta < dia_desde:
+        return jsonify({'error': 'La fecha "hasta" debe ser posterior a "desde"'}), 400
+    if dia_hasta - dia_desde >= MAX_DIAS_AGENDA:
+        return jsonify({'error': f'El rango máximo es de {MAX_DIAS_AGENDA} días'}), 400
+    
+    doctor_id = request.args.get('doctor_id')
+    if doctor_id:
+        try:
+            doctor_id = int(doctor_id)
+        except ValueError:
+            return jsonify({'error': 'doctor_id inválido'}), 400
+        if not any(d['id'] == doctor_id for d in doctores):
+            return jsonify({'error': 'Doctor no encontrado'}), 404
+        entradas = agenda_rango(doctor_id, dia_desde, dia_hasta)
+    else:
+        # Agenda de la clínica: mezcla ordenada de los rangos de cada doctor
+        entradas = heapq.merge(*(agenda_rango(d, dia_desde, dia_hasta) for d in agendas_doctor))
+    
+    incluir_canceladas = request.args.get('incluir_canceladas') in ('1', 'true')
+    resultado = []
+    for _, _, cita_id in entradas:
+        cita = cita_por_id(cita_id)
+        if incluir_canceladas or cita['estado'] == 'Agendada':
+            resultado.append(cita)
+    
+    return jsonify({
+        'desde': fecha_iso(dia_desde),
+        'hasta': fecha_iso(dia_hasta),
+        'doctor_id': doctor_id or None,
+        'total': len(resultado),
+        'citas': resultado
+    })
 
 
 @app.route('/api/limpiar', methods=['POST'])
+@limitar_tasa
 def limpiar_citas():
     """API: Limpia todas las citas (útil para testing)"""
     global citas
+    auditar('citas_limpiadas', citas_eliminadas=len(citas),
+            solicitudes_espera_eliminadas=len(lista_espera.solicitudes))
     citas = []
+    horarios_doctor.clear()
+    horarios_paciente.clear()
+    agendas_doctor.clear()
+    lista_espera.limpiar()
+    bus_eventos.publicar('citas_limpiadas', {})
     return jsonify({'success': True, 'mensaje': 'Todas las citas han sido eliminadas'})
 
 
+def cargar_datos_masivos(nuevos_pacientes=None, nuevos_doctores=None, nuevas_citas=None):
+    """Carga masiva en memoria, sin las validaciones por petición de /api/agendar"""
+    pacientes.update(nuevos_pacientes or {})
+    if nuevos_doctores:
+        doctores.extend(nuevos_doctores)
+        cache_json.pop('doctores', None)
+    citas.extend(nuevas_citas or [])
+    for cita in nuevas_citas or []:
+        indexar_cita(cita, ordenar=False)
+    for agenda in agendas_doctor.values():
+        agenda.sort()
+
+
+@app.route('/api/sembrar', methods=['POST'])
+@limitar_tasa
+def sembrar_datos():
+    """API: Genera y carga datos sintéticos a gran escala (útil para testing)"""
+    if not app.config['SEMBRADO_ACTIVO']:
+        return jsonify({'error': 'Sembrado desactivado (SEMBRADO=1)'}), 404
+    data = request.get_json(silent=True) or {}
+    
+    try:
+        n_pacientes = int(data.get('pacientes', 0))
+        n_doctores = int(data.get('doctores', 0))
+        n_citas = int(data.get('citas', 0))
+        semilla = int(data.get('semilla', 42))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Parámetros de sembrado inválidos'}), 400
+    
+    if min(n_pacientes, n_doctores, n_citas) < 0:
+        return jsonify({'error': 'Las cantidades no pueden ser negativas'}), 400
+    for campo, cantidad in (('pacientes', n_pacientes), ('doctores', n_doctores), ('citas', n_citas)):
+        if cantidad > MAX_SEMBRADO[campo]:
+            return jsonify({'error': f'Máximo de {MAX_SEMBRADO[campo]} {campo} por llamada'}), 400
+    
+    inicio = time.perf_counter()
+    escenario = generar_escenario(
+        n_pacientes, n_doctores, n_citas, semilla,
+        pacientes_existentes=pacientes,
+        doctores_existentes=doctores,
+        id_cita_inicial=len(citas) + 1,
+        ocupados_doctor=horarios_doctor,
+        ocupados_paciente=horarios_paciente
+    )
+    cargar_datos_masivos(escenario['pacientes'], escenario['doctores'], escenario['citas'])
+    bus_eventos.publicar('datos_cargados', estado_actual())
+    auditar('datos_sembrados', pacientes=len(escenario['pacientes']), doctores=len(escenario['doctores']),
+            citas=len(escenario['citas']), semilla=semilla)
+    
+    return jsonify({
+        'success': True,
+        'pacientes_cargados': len(escenario['pacientes']),
+        'doctores_cargados': len(escenario['doctores']),
+        'citas_cargadas': len(escenario['citas']),
+        'duracion_s': round(time.perf_counter() - inicio, 3)
+    })
+
+
+@app.route('/api/eventos', methods=['GET'])
+def eventos():
+    """API: Flujo SSE con los cambios de citas (agendadas, canceladas, limpiadas)"""
+    try:
+        ultimo_id = int(request.headers.get('Last-Event-ID', ''))
+    except ValueError:
+        ultimo_id = None
+    
+    suscripcion = bus_eventos.suscribir(ultimo_id)
+    return Response(
+        bus_eventos.transmitir(suscripcion),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+def exigir_admin():
+    """None si se permite el acceso administrativo; si no, la respuesta de error"""
+    if not app.config['PERFILADO_ACTIVO']:
+        return jsonify({'error': 'Perfilado desactivado (PERFILADO=1)'}), 404
+    token = app.config['ADMIN_TOKEN']
+    if not token:
+        return jsonify({'error': 'Acceso administrativo deshabilitado: configure ADMIN_TOKEN'}), 403
+    if not hmac.compare_digest(request.headers.get('X-Admin-Token', ''), token):
+        return jsonify({'error': 'No autorizado'}), 403
+    return None
+
+
+@app.route('/api/admin/perfiles', methods=['GET'])
+def listar_perfiles():
+    """API: Últimas peticiones lentas (o forzadas) con perfil capturado"""
+    error = exigir_admin()
+    if error:
+        return error
+    return jsonify({
+        'umbral_ms': perfilador.umbral * 1000,
+        'tasa_muestreo': perfilador.tasa_muestreo,
+        'perfiles': perfilador.resumen()
+    })
+
+
+@app.route('/api/admin/perfiles/<int:perfil_id>', methods=['GET'])
+def obtener_perfil(perfil_id):
+    """API: Detalle de un perfil (informe de cProfile y pilas muestreadas)"""
+    error = exigir_admin()
+    if error:
+        return error
+    perfil = perfilador.detalle(perfil_id)
+    if perfil is None:
+        return jsonify({'error': 'Perfil no encontrado'}), 404
+    return jsonify(perfil)
+
+
+@app.route('/api/salud', methods=['GET'])
+def salud():
+    """API: Sonda de disponibilidad (readiness) para CI y balanceadores"""
+    return jsonify({'estado': 'listo'})
+
+
 @app.route('/api/estado', methods=['GET'])
 def estado_sistema():
     """API: Verifica el estado del sistema"""
-    return jsonify({
+    return jsonify(estado_actual())
+
+
+def estado_actual():
+    """Resumen del estado del sistema"""
+    return {
         'estado': 'Operativo',
         'pacientes_registrados': len(pacientes),
         'doctores_disponibles': len(doctores),
         'citas_agendadas': len(citas),
-        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    })
+        'timestamp': reloj.marca()
+    }
+
+
+@app.route('/api/inicio', methods=['GET'])
+def datos_inicio():
+    """
+    API: Datos de arranque de la interfaz en una sola respuesta.
+
+    Incluye doctores y estado del sistema; con ?rut= agrega el paciente,
+    sus citas y un resumen. La lista de doctores se inserta pre-serializada.
+    """
+    extra = {'estado': estado_actual()}
+    
+    rut = request.args.get('rut', '').strip()
+    if rut:
+        if rut in pacientes:
+            citas_paciente = citas_de_paciente(rut)
+            extra['paciente'] = pacientes[rut]
+            extra['citas'] = citas_paciente
+            extra['resumen'] = resumen_citas(citas_paciente)
+        else:
+            extra['paciente'] = None
+            extra['error'] = 'Paciente no encontrado'
+    
+    cuerpo = '{"doctores":' + doctores_json() + ',' + app.json.dumps(extra)[1:]
+    return app.response_class(cuerpo, mimetype='application/json')
+
+
+def iniciar_servidor(host='127.0.0.1', puerto=5000, debug=False):
+    """Inicia el servidor; sin depurador ni recargador salvo que se pida debug"""
+    app.run(host=host, port=puerto, debug=debug, use_reloader=debug, threaded=True)
 
 
 if __name__ == '__main__':
+    puerto = int(os.getenv('PUERTO', '5000'))
+    debug = os.getenv('FLASK_DEBUG', '0').lower() in ('1', 'true')
+    
     print("="*80)
     print("SISTEMA DE CONSULTAS OFTALMOLÓGICAS - CLÍNICA VISIÓN CLARA")
     print("="*80)
-    print("Servidor iniciando en: http://localhost:5000")
+    print(f"Servidor iniciando en: http://localhost:{puerto}")
+    print(f"Modo depuración: {'activado' if debug else 'desactivado'}")
     print("Presiona CTRL+C para detener")
     print("="*80)
     
-    app.run(debug=True, port=5000)
+    iniciar_servidor(host=os.getenv('HOST', '127.0.0.1'), puerto=puerto, debug=debug)
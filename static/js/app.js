@@ -0,0 +1,415 @@
+// Cargar doctores y estado del sistema al iniciar (una sola petición)
+window.onload = function() {
+    cargarInicio();
+    establecerFechaMinima();
+    escucharEventos();
+    // Si cambian los datos del formulario, el próximo envío es una solicitud nueva
+    document.getElementById('form-agendar').addEventListener('input', () => { claveAgendar = null; });
+};
+
+// Vista actual de "Consultar Citas" (null = aún no se ha buscado) y último estado recibido
+let filtroCitas = null;
+let estadoActual = null;
+
+// Idempotency-Key del envío en curso: se reutiliza si el usuario reintenta tras un error de red
+let claveAgendar = null;
+
+function nuevaClave() {
+    if (window.crypto && crypto.randomUUID) {
+        return crypto.randomUUID();
+    }
+    return `${Date.now()}-${Math.random().toString(16).slice(2)}`;
+}
+
+function cambiarTab(tabName) {
+    // Ocultar todos los tabs
+    const tabs = document.querySelectorAll('.tab-content');
+    tabs.forEach(tab => tab.classList.remove('active'));
+
+    // Desactivar todos los botones
+    const buttons = document.querySelectorAll('.tab-button');
+    buttons.forEach(btn => btn.classList.remove('active'));
+
+    // Activar el tab seleccionado
+    document.getElementById('tab-' + tabName).classList.add('active');
+    event.target.classList.add('active');
+}
+
+function establecerFechaMinima() {
+    const hoy = new Date().toISOString().split('T')[0];
+    document.getElementById('fecha').setAttribute('min', hoy);
+}
+
+async function cargarInicio() {
+    try {
+        const response = await fetch('/api/inicio');
+        const datos = await response.json();
+
+        mostrarDoctores(datos.doctores);
+        estadoActual = datos.estado;
+        mostrarEstado(estadoActual);
+    } catch (error) {
+        console.error('Error al cargar datos iniciales:', error);
+    }
+}
+
+function mostrarDoctores(doctores) {
+    ['doctor', 'agenda-doctor'].forEach(id => {
+        const select = document.getElementById(id);
+        doctores.forEach(doctor => {
+            const option = document.createElement('option');
+            option.value = doctor.id;
+            option.textContent = `${doctor.nombre} - ${doctor.especialidad}`;
+            select.appendChild(option);
+        });
+    });
+}
+
+async function agendarCita(event) {
+    event.preventDefault();
+
+    const alertDiv = document.getElementById('alert-agendar');
+    const form = document.getElementById('form-agendar');
+
+    const datos = {
+        rut_paciente: document.getElementById('rut-paciente').value,
+        doctor_id: document.getElementById('doctor').value,
+        fecha: document.getElementById('fecha').value,
+        hora: document.getElementById('hora').value,
+        tipo_consulta: document.getElementById('tipo-consulta').value
+    };
+
+    claveAgendar = claveAgendar || nuevaClave();
+
+    try {
+        const response = await fetch('/api/agendar', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'Idempotency-Key': claveAgendar
+            },
+            body: JSON.stringify(datos)
+        });
+
+        const resultado = await response.json();
+
+        if (response.ok) {
+            mostrarAlerta('alert-agendar', 'success', '✅ ' + resultado.mensaje);
+            form.reset();
+            claveAgendar = null;
+        } else {
+            // 409 (original en proceso), 429 y 5xx pueden reintentarse con la misma clave
+            if (response.status !== 409 && response.status !== 429 && response.status < 500) {
+                claveAgendar = null;
+            }
+            mostrarAlerta('alert-agendar', 'error', '❌ ' + resultado.error);
+        }
+    } catch (error) {
+        mostrarAlerta('alert-agendar', 'error', '❌ Error de conexión: ' + error.message);
+    }
+}
+
+async function consultarCitas() {
+    const rut = document.getElementById('rut-consulta').value;
+    const url = rut ? `/api/citas/${rut}` : '/api/citas';
+
+    try {
+        const response = await fetch(url);
+        const citas = await response.json();
+
+        const container = document.getElementById('citas-list');
+        filtroCitas = rut;
+
+        if (citas.length === 0) {
+            container.innerHTML = SIN_CITAS;
+            return;
+        }
+
+        container.innerHTML = citas.map(tarjetaCita).join('');
+    } catch (error) {
+        console.error('Error al consultar citas:', error);
+    }
+}
+
+async function consultarAgenda() {
+    const params = new URLSearchParams({vista: document.getElementById('agenda-vista').value});
+    const fecha = document.getElementById('agenda-fecha').value;
+    const doctor = document.getElementById('agenda-doctor').value;
+    if (fecha) {
+        params.set('fecha', fecha);
+    }
+    if (doctor) {
+        params.set('doctor_id', doctor);
+    }
+
+    const container = document.getElementById('agenda-container');
+    try {
+        const response = await fetch(`/api/agenda?${params}`);
+        const agenda = await response.json();
+
+        if (!response.ok) {
+            container.innerHTML = `<p style="text-align: center; color: #721c24; padding: 20px;">❌ ${agenda.error}</p>`;
+            return;
+        }
+
+        const rango = agenda.desde === agenda.hasta ? agenda.desde : `${agenda.desde} a ${agenda.hasta}`;
+        if (agenda.total === 0) {
+            container.innerHTML = `<p style="text-align: center; color: #666; padding: 20px;">Sin citas agendadas (${rango}).</p>`;
+            return;
+        }
+
+        // Las citas vienen ordenadas por fecha y hora: se agrupan por día
+        const porDia = {};
+        agenda.citas.forEach(cita => {
+            (porDia[cita.fecha] = porDia[cita.fecha] || []).push(cita);
+        });
+
+        container.innerHTML = `<p style="margin: 15px 0;"><strong>${agenda.total}</strong> citas (${rango})</p>` +
+            Object.entries(porDia).map(([dia, citasDia]) => `
+                <div class="agenda-dia">
+                    <h4>📅 ${dia}</h4>
+                    ${citasDia.map(cita => `
+                        <div class="agenda-fila">
+                            <strong>${cita.hora}</strong>
+                            <span>${cita.nombre_paciente}</span>
+                            <span>${cita.nombre_doctor}</span>
+                            <span>${cita.tipo_consulta}</span>
+                        </div>
+                    `).join('')}
+                </div>
+            `).join('');
+    } catch (error) {
+        console.error('Error al consultar agenda:', error);
+    }
+}
+
+const SIN_CITAS = '<p style="text-align: center; color: #666; padding: 20px;">No se encontraron citas.</p>';
+
+function tarjetaCita(cita) {
+    return `
+        <div class="cita-card" id="cita-${cita.id}">
+            <h3>Cita #${cita.id}</h3>
+            <div class="cita-info">
+                <div class="cita-info-item">
+                    <strong>Paciente:</strong><br>${cita.nombre_paciente}
+                </div>
+                <div class="cita-info-item">
+                    <strong>Doctor:</strong><br>${cita.nombre_doctor}
+                </div>
+                <div class="cita-info-item">
+                    <strong>Fecha:</strong><br>${cita.fecha}
+                </div>
+                <div class="cita-info-item">
+                    <strong>Hora:</strong><br>${cita.hora}
+                </div>
+                <div class="cita-info-item">
+                    <strong>Tipo:</strong><br>${cita.tipo_consulta}
+                </div>
+            </div>
+            <span class="estado-badge estado-${cita.estado.toLowerCase()}">${cita.estado}</span>
+            ${cita.estado === 'Agendada' ? `<button class="btn-cancelar" onclick="cancelarCita(${cita.id})">Cancelar Cita</button>` : ''}
+        </div>
+    `;
+}
+
+// Cambios en tiempo real: se aplican solo los deltas, sin volver a descargar listas
+function escucharEventos() {
+    if (!window.EventSource) {
+        return;
+    }
+    const fuente = new EventSource('/api/eventos');
+
+    fuente.addEventListener('cita_agendada', e => {
+        const cita = JSON.parse(e.data);
+        if (filtroCitas !== null && (filtroCitas === '' || filtroCitas === cita.rut_paciente)
+                && !document.getElementById(`cita-${cita.id}`)) {
+            const container = document.getElementById('citas-list');
+            if (!container.querySelector('.cita-card')) {
+                container.innerHTML = '';
+            }
+            container.insertAdjacentHTML('beforeend', tarjetaCita(cita));
+        }
+        actualizarContadores({citas_agendadas: 1});
+    });
+
+    fuente.addEventListener('cita_cancelada', e => {
+        aplicarCancelacion(JSON.parse(e.data).id);
+    });
+
+    fuente.addEventListener('citas_limpiadas', () => {
+        if (filtroCitas !== null) {
+            document.getElementById('citas-list').innerHTML = SIN_CITAS;
+        }
+        actualizarContadores({citas_agendadas: null});
+    });
+
+    fuente.addEventListener('datos_cargados', e => {
+        estadoActual = JSON.parse(e.data);
+        mostrarEstado(estadoActual);
+    });
+
+    fuente.addEventListener('resincronizar', () => {
+        // Se perdieron eventos: recargar las vistas abiertas una sola vez
+        if (filtroCitas !== null) {
+            consultarCitas();
+        }
+        actualizarEstado();
+    });
+}
+
+function aplicarCancelacion(citaId) {
+    const tarjeta = document.getElementById(`cita-${citaId}`);
+    if (!tarjeta) {
+        return;
+    }
+    const badge = tarjeta.querySelector('.estado-badge');
+    badge.className = 'estado-badge estado-cancelada';
+    badge.textContent = 'Cancelada';
+    const boton = tarjeta.querySelector('.btn-cancelar');
+    if (boton) {
+        boton.remove();
+    }
+}
+
+function actualizarContadores(delta) {
+    if (!estadoActual) {
+        return;
+    }
+    // null reinicia el contador; un número se suma
+    for (const [campo, valor] of Object.entries(delta)) {
+        estadoActual[campo] = valor === null ? 0 : estadoActual[campo] + valor;
+    }
+    estadoActual.timestamp = new Date().toLocaleString('sv-SE');
+    mostrarEstado(estadoActual);
+}
+
+async function cancelarCita(citaId) {
+    if (!confirm('¿Está seguro de que desea cancelar esta cita?')) {
+        return;
+    }
+
+    try {
+        const response = await fetch(`/api/cancelar/${citaId}`, {
+            method: 'POST'
+        });
+
+        const resultado = await response.json();
+
+        if (response.ok) {
+            alert('✅ ' + resultado.mensaje);
+            aplicarCancelacion(citaId);
+        } else {
+            alert('❌ ' + resultado.error);
+        }
+    } catch (error) {
+        alert('❌ Error de conexión: ' + error.message);
+    }
+}
+
+async function consultarHistorial() {
+    const rut = document.getElementById('rut-historial').value;
+
+    if (!rut) {
+        alert('Por favor ingrese un RUT');
+        return;
+    }
+
+    try {
+        const response = await fetch(`/api/inicio?rut=${encodeURIComponent(rut)}`);
+        const datos = await response.json();
+
+        if (!datos.paciente) {
+            document.getElementById('historial-container').innerHTML = 
+                `<p style="text-align: center; color: #721c24; padding: 20px;">❌ ${datos.error}</p>`;
+            return;
+        }
+
+        const paciente = datos.paciente;
+        const resumen = datos.resumen;
+        const proxima = resumen.proxima_cita
+            ? `${resumen.proxima_cita.fecha} ${resumen.proxima_cita.hora} con ${resumen.proxima_cita.nombre_doctor}`
+            : 'Sin citas agendadas';
+
+        let html = `
+            <div style="background: #f8f9fa; padding: 20px; border-radius: 8px; margin: 20px 0;">
+                <h3 style="color: #667eea; margin-bottom: 15px;">Información del Paciente</h3>
+                <p><strong>Nombre:</strong> ${paciente.nombre}</p>
+                <p><strong>RUT:</strong> ${paciente.rut}</p>
+                <p><strong>Email:</strong> ${paciente.email}</p>
+                <p><strong>Teléfono:</strong> ${paciente.telefono}</p>
+                <p><strong>Citas:</strong> ${resumen.agendadas} agendadas, ${resumen.canceladas} canceladas</p>
+                <p><strong>Próxima cita:</strong> ${proxima}</p>
+            </div>
+
+            <h3 style="margin: 20px 0;">Historial de Consultas</h3>
+        `;
+
+        paciente.historial.forEach(consulta => {
+            html += `
+                <div class="historial-item">
+                    <h4>📅 ${consulta.fecha}</h4>
+                    <p><strong>Tipo:</strong> ${consulta.tipo}</p>
+                    <p><strong>Diagnóstico:</strong> ${consulta.diagnostico}</p>
+                    <p><strong>Doctor:</strong> ${consulta.doctor}</p>
+                </div>
+            `;
+        });
+
+        document.getElementById('historial-container').innerHTML = html;
+    } catch (error) {
+        console.error('Error al consultar historial:', error);
+        document.getElementById('historial-container').innerHTML = 
+            `<p style="text-align: center; color: #721c24; padding: 20px;">❌ Error de conexión</p>`;
+    }
+}
+
+async function actualizarEstado() {
+    try {
+        const response = await fetch('/api/estado');
+        estadoActual = await response.json();
+        mostrarEstado(estadoActual);
+    } catch (error) {
+        console.error('Error al actualizar estado:', error);
+    }
+}
+
+function mostrarEstado(estado) {
+    const html = `
+        <div class="sistema-estado">
+            <h3>Estado Actual del Sistema</h3>
+            <div class="stats-grid">
+                <div class="stat-item">
+                    <div class="stat-value">${estado.pacientes_registrados}</div>
+                    <div class="stat-label">Pacientes Registrados</div>
+                </div>
+                <div class="stat-item">
+                    <div class="stat-value">${estado.doctores_disponibles}</div>
+                    <div class="stat-label">Doctores Disponibles</div>
+                </div>
+                <div class="stat-item">
+                    <div class="stat-value">${estado.citas_agendadas}</div>
+                    <div class="stat-label">Citas Agendadas</div>
+                </div>
+                <div class="stat-item">
+                    <div class="stat-value">${estado.estado}</div>
+                    <div class="stat-label">Estado del Sistema</div>
+                </div>
+            </div>
+            <p style="margin-top: 15px; opacity: 0.9;">
+                <strong>Última actualización:</strong> ${estado.timestamp}
+            </p>
+        </div>
+    `;
+
+    document.getElementById('estado-container').innerHTML = html;
+}
+
+function mostrarAlerta(id, tipo, mensaje) {
+    const alertDiv = document.getElementById(id);
+    alertDiv.className = `alert ${tipo} show`;
+    alertDiv.textContent = mensaje;
+
+    setTimeout(() => {
+        alertDiv.classList.remove('show');
+    }, 5000);
+}